@@ -0,0 +1,28 @@
+"""metrics ad/date covering index
+
+Revision ID: 005_metrics_ad_date
+Revises: 004_lead_admin
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+
+revision = '005_metrics_ad_date'
+down_revision = '004_lead_admin'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Covers per-creative aggregates (ad_id IN (...) AND date >= ...) so the
+    # summed columns are served by an index-only scan.
+    op.create_index(
+        'idx_metrics_ad_date',
+        'marketing_metrics',
+        ['ad_id', 'date'],
+        postgresql_include=['impressions', 'clicks', 'leads', 'closed_won', 'spend'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_metrics_ad_date', table_name='marketing_metrics')
@@ -0,0 +1,28 @@
+"""metrics campaign/date covering index
+
+Revision ID: 006_metrics_campaign_date
+Revises: 005_metrics_ad_date
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from alembic import op
+
+revision = '006_metrics_campaign_date'
+down_revision = '005_metrics_ad_date'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Covers per-campaign aggregates (campaign_id = ... AND date >= ...) so the
+    # summed columns are served by an index-only scan.
+    op.create_index(
+        'idx_metrics_campaign_date',
+        'marketing_metrics',
+        ['campaign_id', 'date'],
+        postgresql_include=['spend', 'leads', 'qualified_leads', 'closed_won'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_metrics_campaign_date', table_name='marketing_metrics')
@@ -0,0 +1,51 @@
+"""campaign strategy persona generated column and persona/platform index
+
+Revision ID: 007_campaign_persona
+Revises: 006_metrics_campaign_date
+Create Date: 2026-10-16 14:00:00.000000
+
+Adding the stored generated column rewrites the whole campaigns table
+under an ACCESS EXCLUSIVE lock; run it in a maintenance window on large
+tables.
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = '007_campaign_persona'
+down_revision = '006_metrics_campaign_date'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Stored integer copy of strategy->>'persona_id' so persona filters and
+    # joins compare a plain indexed column. Values that are not plain
+    # integers (e.g. "abc", "", 1.0) become NULL instead of failing the cast.
+    op.add_column(
+        'campaigns',
+        sa.Column(
+            'strategy_persona_id',
+            sa.Integer(),
+            sa.Computed(
+                "CASE WHEN strategy ->> 'persona_id' ~ '^[0-9]{1,9}$' "
+                "THEN (strategy ->> 'persona_id')::integer END",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    # Per-persona, per-platform campaign lookups (platform selection and
+    # cross-platform optimization); the persona-only prefix serves plain
+    # persona filters.
+    op.create_index(
+        'idx_campaigns_persona_platform',
+        'campaigns',
+        ['strategy_persona_id', 'platform'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_campaigns_persona_platform', table_name='campaigns')
+    op.drop_column('campaigns', 'strategy_persona_id')
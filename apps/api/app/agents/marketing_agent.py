@@ -207,7 +207,7 @@ class MarketingAgent:
     
     async def _discover_personas(self) -> List[Persona]:
         """Discover personas from lead data."""
-        return self.persona_service.discover_personas(
+        return await self.persona_service.discover_personas(
             min_cluster_size=25,
             method="hdbscan"
         )
@@ -810,11 +810,12 @@ class MarketingAgent:
                     results["experiments_stopped"] += 1
             
             # Match unassigned leads to personas
-            lead_matches = self.lead_matcher.batch_match_leads(
-                auto_assign=auto_apply
-            )
+            # Stream chunks so memory stays bounded however many leads are unassigned
             results["personas_matched"] = sum(
-                1 for matches in lead_matches.values()
+                1 for _, matches in self.lead_matcher.iter_batch_matches(
+                    auto_assign=auto_apply,
+                    top_k=1
+                )
                 if matches and matches[0].is_strong_match
             )
             
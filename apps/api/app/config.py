@@ -15,6 +15,9 @@ class Settings(BaseSettings):
 
     # Redis
     redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379")
+    # Upper bound on pooled connections per process; keep workers x this
+    # under the server's maxclients
+    redis_max_connections: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
 
     # Qdrant
     qdrant_url: str = os.getenv("QDRANT_URL", "http://localhost:6333")
@@ -25,6 +28,7 @@ class Settings(BaseSettings):
     openai_chat_model: str = os.getenv("OPENAI_CHAT_MODEL", "gpt-4.1-mini")
     openai_embedding_model: str = os.getenv(
         "OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+    openai_persona_model: str = os.getenv("OPENAI_PERSONA_MODEL", "gpt-4o-mini")
 
     # Optional auth
     app_secret: str | None = os.getenv("APP_SECRET")
@@ -3,7 +3,7 @@ from typing import Generator
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from qdrant_client import QdrantClient
-from redis import Redis
+from redis import BlockingConnectionPool, Redis
 
 from .config import get_settings
 
@@ -50,8 +50,13 @@ def get_redis() -> Redis:
     """Redis client dependency"""
     global _redis_client
     if _redis_client is None:
-        _redis_client = Redis.from_url(
-            settings.redis_url,
-            decode_responses=True,
+        # Bounded pool shared by all request threads; callers wait for a free
+        # connection instead of opening past redis_max_connections
+        _redis_client = Redis(
+            connection_pool=BlockingConnectionPool.from_url(
+                settings.redis_url,
+                max_connections=settings.redis_max_connections,
+                decode_responses=True,
+            )
         )
     return _redis_client
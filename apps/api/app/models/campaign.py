@@ -1,6 +1,6 @@
 """Campaign model for multi-platform marketing"""
 from decimal import Decimal
-from sqlalchemy import String, Integer, ForeignKey, Enum, Numeric, DateTime
+from sqlalchemy import String, Integer, ForeignKey, Enum, Numeric, DateTime, Index, Computed
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.ext.mutable import MutableDict
@@ -44,6 +44,10 @@ class Campaign(Base, TimestampMixin):
     """
     __tablename__ = "campaigns"
 
+    __table_args__ = (
+        Index('idx_campaigns_persona_platform', 'strategy_persona_id', 'platform'),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True)
     
     # Identity
@@ -89,6 +93,18 @@ class Campaign(Base, TimestampMixin):
     #   "hypothesis": "High-income professionals respond to luxury positioning"
     # }
     
+    # strategy->>'persona_id' as an integer, maintained by Postgres so persona
+    # lookups are plain indexed comparisons instead of per-row JSON casts;
+    # NULL when the value is not a plain integer
+    strategy_persona_id: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        Computed(
+            "CASE WHEN strategy ->> 'persona_id' ~ '^[0-9]{1,9}$' "
+            "THEN (strategy ->> 'persona_id')::integer END",
+            persisted=True,
+        )
+    )
+
     # Relationships
     ad_sets: Mapped[list["AdSet"]] = relationship(back_populates="campaign", cascade="all, delete-orphan")
 
@@ -1,6 +1,6 @@
 """Marketing metrics model for performance tracking"""
 from decimal import Decimal
-from sqlalchemy import String, Integer, ForeignKey, Date, Numeric, UniqueConstraint
+from sqlalchemy import String, Integer, ForeignKey, Date, Numeric, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.ext.mutable import MutableDict
@@ -20,6 +20,14 @@ class MarketingMetric(Base, TimestampMixin):
     
     __table_args__ = (
         UniqueConstraint('date', 'campaign_id', 'ad_set_id', 'ad_id', name='uix_metrics_date_campaign_adset_ad'),
+        Index(
+            'idx_metrics_ad_date', 'ad_id', 'date',
+            postgresql_include=['impressions', 'clicks', 'leads', 'closed_won', 'spend'],
+        ),
+        Index(
+            'idx_metrics_campaign_date', 'campaign_id', 'date',
+            postgresql_include=['spend', 'leads', 'qualified_leads', 'closed_won'],
+        ),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -141,7 +141,7 @@ async def discover_personas(
     """
     try:
         service = PersonaDiscoveryService(db)
-        personas = service.discover_personas(
+        personas = await service.discover_personas(
             min_cluster_size=request.min_cluster_size,
             method=request.method
         )
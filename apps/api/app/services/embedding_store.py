@@ -39,6 +39,7 @@ class EmbeddingStore(Protocol):
         query_text: str,
         top_k: int = 10,
         filter: Optional[Dict[str, Any]] = None,
+        query_embedding: Optional[List[float]] = None,
     ) -> List[SearchResult]:
         """Search for similar documents"""
         ...
@@ -74,6 +75,10 @@ class QdrantEmbeddingStore:
                     ),
                 )
 
+    def embed(self, text: str) -> List[float]:
+        """Embed text with the configured embedding model"""
+        return self._get_embedding(text)
+
     def _get_embedding(self, text: str) -> List[float]:
         """Get embedding from OpenAI"""
         response = self.openai_client.embeddings.create(
@@ -103,9 +108,11 @@ class QdrantEmbeddingStore:
         query_text: str,
         top_k: int = 10,
         filter: Optional[Dict[str, Any]] = None,
+        query_embedding: Optional[List[float]] = None,
     ) -> List[SearchResult]:
-        """Search for similar documents"""
-        query_embedding = self._get_embedding(query_text)
+        """Search for similar documents (reusing query_embedding when already computed)"""
+        if query_embedding is None:
+            query_embedding = self._get_embedding(query_text)
 
         # Build filter if provided
         qdrant_filter = None
@@ -179,7 +179,7 @@ class CrossPlatformOptimizer:
         # Find active campaigns for this persona
         query = select(Campaign).where(
             Campaign.status.in_([CampaignStatus.ACTIVE, CampaignStatus.PAUSED]),
-            Campaign.strategy["persona_id"].astext.cast(int) == persona_id
+            Campaign.strategy_persona_id == persona_id
         )
         
         if include_platforms:
@@ -208,20 +208,21 @@ class CrossPlatformOptimizer:
         scores = {}
         
         for platform in platforms:
-            # Find campaigns for this persona on this platform
-            campaigns = self.db.execute(
-                select(Campaign).where(
+            # Find campaign ids for this persona on this platform
+            campaign_ids = self.db.execute(
+                select(Campaign.id).where(
                     Campaign.platform == CampaignPlatform(platform),
-                    Campaign.strategy["persona_id"].astext.cast(int) == persona_id
+                    Campaign.strategy_persona_id == persona_id
                 )
             ).scalars().all()
             
-            if not campaigns:
+            if not campaign_ids:
                 # No history - use prior from platform selector
                 platform_rec = self.platform_selector.select_platforms_for_persona(
                     persona_id=persona_id,
                     total_budget=100,  # Dummy budget for scoring
-                    objective="lead_generation"
+                    objective="lead_generation",
+                    generate_rationale=False
                 )
                 
                 for p in platform_rec.platforms:
@@ -242,8 +243,6 @@ class CrossPlatformOptimizer:
                     }
                 continue
             
-            campaign_ids = [c.id for c in campaigns]
-            
             # Aggregate metrics with recency weighting
             metrics = self.db.execute(
                 select(
@@ -523,7 +522,7 @@ class CrossPlatformOptimizer:
             campaigns = self.db.execute(
                 select(Campaign).where(
                     Campaign.platform == CampaignPlatform(allocation.platform),
-                    Campaign.strategy["persona_id"].astext.cast(int) == recommendation.persona_id,
+                    Campaign.strategy_persona_id == recommendation.persona_id,
                     Campaign.status == CampaignStatus.ACTIVE
                 )
             ).scalars().all()
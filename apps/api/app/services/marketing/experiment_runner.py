@@ -5,12 +5,15 @@ Executes and analyzes A/B tests for marketing campaigns.
 Implements statistical significance testing and auto-stopping rules.
 """
 from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import lru_cache
+from statistics import NormalDist
+import math
 import numpy as np
-from scipy import stats
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func, update
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import select, func, update, bindparam, any_, ARRAY, Integer, Date
 
 from ...config import get_settings
 from ...logging import get_logger
@@ -24,6 +27,34 @@ settings = get_settings()
 logger = get_logger(__name__)
 
 
+@lru_cache(maxsize=32)
+def _z_crit(alpha: float) -> float:
+    """Two-sided critical z value for significance level alpha (cached)."""
+    return NormalDist().inv_cdf(1 - alpha / 2)
+
+
+# Per-creative metric sums for every variant of an experiment, built once at
+# import. The creative ids are bound as a single array parameter so the SQL
+# text (and the statement cache entry) is identical regardless of variant count.
+# Only the summed columns are read, so idx_metrics_ad_date covers the scan.
+_VARIANT_METRICS_QUERY = select(
+    Ad.creative_id.label('creative_id'),
+    func.coalesce(func.sum(MarketingMetric.impressions), 0).label('impressions'),
+    func.coalesce(func.sum(MarketingMetric.clicks), 0).label('clicks'),
+    func.coalesce(func.sum(MarketingMetric.leads), 0).label('leads'),
+    func.coalesce(func.sum(MarketingMetric.closed_won), 0).label('conversions'),
+    func.coalesce(func.sum(MarketingMetric.spend), 0).label('spend')
+).select_from(MarketingMetric).join(
+    Ad, Ad.id == MarketingMetric.ad_id
+).where(
+    Ad.creative_id == any_(bindparam('creative_ids', type_=ARRAY(Integer)))
+).group_by(Ad.creative_id)
+
+_VARIANT_METRICS_SINCE_QUERY = _VARIANT_METRICS_QUERY.where(
+    MarketingMetric.date >= bindparam('start_date', type_=Date)
+)
+
+
 @dataclass
 class VariantResult:
     """Results for a single experiment variant."""
@@ -76,6 +107,9 @@ class ExperimentRunnerService:
     DEFAULT_CONFIDENCE_LEVEL = 0.95
     DEFAULT_MDE = 0.05  # 5% minimum detectable effect
     
+    # Upper bound on experiments checked concurrently (one pooled connection each)
+    MAX_CHECK_WORKERS = 8
+
     def __init__(self, db: Session):
         self.db = db
     
@@ -176,12 +210,13 @@ class ExperimentRunnerService:
         
         return experiment
     
-    def analyze_experiment(self, experiment_id: int) -> ExperimentResult:
+    def analyze_experiment(self, experiment_id: int, persist: bool = True) -> ExperimentResult:
         """
         Analyze a running or completed experiment.
         
         Args:
             experiment_id: Experiment to analyze
+            persist: If False, skip writing the analysis back to the experiment
         
         Returns:
             ExperimentResult with statistical analysis
@@ -190,25 +225,38 @@ class ExperimentRunnerService:
         if not experiment:
             raise ValueError(f"Experiment {experiment_id} not found")
         
+        # Single clock reading so days_running and the recommendation agree
+        now = datetime.utcnow()
         design = experiment.design or {}
         
-        # Get control results
+        # Get control and variant results in one round trip
         control_creative_id = design.get("control", {}).get("creative_id")
-        control_result = self._get_variant_metrics(
-            control_creative_id, experiment.start_date, "control"
+        variants = design.get("variants", [])
+        metrics_by_creative = self._get_creative_metrics(
+            [control_creative_id] + [v.get("creative_id") for v in variants],
+            experiment.start_date
         )
         
-        # Get variant results
-        variant_results = []
-        for variant in design.get("variants", []):
-            creative_id = variant.get("creative_id")
-            name = variant.get("name", "variant")
-            result = self._get_variant_metrics(creative_id, experiment.start_date, name)
-            variant_results.append(result)
-        
-        # Find best variant
-        all_results = [control_result] + variant_results
-        best_variant = max(all_results, key=lambda x: x.cvr if x.leads > 0 else 0)
+        control_result = self._get_variant_metrics(
+            control_creative_id, "control", metrics_by_creative
+        )
+        variant_results = [
+            self._get_variant_metrics(
+                v.get("creative_id"), v.get("name", "variant"), metrics_by_creative
+            )
+            for v in variants
+        ]
+
+        # Single pass: best CVR (cvr is 0 without leads), smallest sample,
+        # and whether any variant has leads to test against
+        best_variant = control_result
+        min_impressions = control_result.impressions
+        any_variant_leads = False
+        for variant in variant_results:
+            if variant.cvr > best_variant.cvr:
+                best_variant = variant
+            min_impressions = min(min_impressions, variant.impressions)
+            any_variant_leads = any_variant_leads or variant.leads > 0
         
         # Calculate statistical significance
         winner = None
@@ -217,7 +265,7 @@ class ExperimentRunnerService:
         confidence_interval = (0.0, 0.0)
         is_significant = False
         
-        if control_result.leads > 0 and any(v.leads > 0 for v in variant_results):
+        if control_result.leads > 0 and any_variant_leads:
             for variant in variant_results:
                 if variant.leads == 0:
                     continue
@@ -241,32 +289,30 @@ class ExperimentRunnerService:
                             winner = "control"
         
         # Check sample size sufficiency
-        min_sample = experiment.minimum_sample_size
-        sample_sufficient = all(
-            r.impressions >= min_sample for r in all_results
-        )
+        sample_sufficient = min_impressions >= experiment.minimum_sample_size
         
         # Generate recommendation
         recommendation = self._generate_recommendation(
-            experiment, is_significant, winner, lift, sample_sufficient
+            experiment, is_significant, winner, lift, sample_sufficient, now=now
         )
         
         # Calculate days running
         days_running = 0
         if experiment.start_date:
-            days_running = (datetime.utcnow() - experiment.start_date).days
+            days_running = (now - experiment.start_date).days
         
         # Update experiment results
-        experiment.results = {
-            "analyzed_at": datetime.utcnow().isoformat(),
-            "winner": winner,
-            "lift": lift,
-            "p_value": p_value,
-            "confidence_interval": list(confidence_interval),
-            "is_significant": is_significant,
-            "recommendation": recommendation
-        }
-        self.db.commit()
+        if persist:
+            experiment.results = {
+                "analyzed_at": now.isoformat(),
+                "winner": winner,
+                "lift": lift,
+                "p_value": p_value,
+                "confidence_interval": list(confidence_interval),
+                "is_significant": is_significant,
+                "recommendation": recommendation
+            }
+            self.db.commit()
         
         return ExperimentResult(
             experiment_id=experiment_id,
@@ -285,27 +331,35 @@ class ExperimentRunnerService:
             days_running=days_running
         )
     
+    def _get_creative_metrics(
+        self,
+        creative_ids: List[Optional[int]],
+        start_date: Optional[datetime]
+    ) -> Dict[int, Any]:
+        """Get summed metrics per creative, keyed by creative ID."""
+        ids = sorted({cid for cid in creative_ids if cid})
+        if not ids:
+            return {}
+
+        if start_date:
+            rows = self.db.execute(
+                _VARIANT_METRICS_SINCE_QUERY,
+                {"creative_ids": ids, "start_date": start_date.date()}
+            )
+        else:
+            rows = self.db.execute(_VARIANT_METRICS_QUERY, {"creative_ids": ids})
+
+        return {row.creative_id: row for row in rows}
+
     def _get_variant_metrics(
         self,
         creative_id: Optional[int],
-        start_date: Optional[datetime],
-        variant_name: str
+        variant_name: str,
+        metrics_by_creative: Dict[int, Any]
     ) -> VariantResult:
-        """Get performance metrics for a variant."""
-        if not creative_id:
-            return VariantResult(
-                variant_name=variant_name,
-                creative_id=None,
-                impressions=0, clicks=0, leads=0, conversions=0,
-                spend=0, ctr=0, cvr=0, cpl=0
-            )
-        
-        # Find ads using this creative
-        ads = self.db.execute(
-            select(Ad.id).where(Ad.creative_id == creative_id)
-        ).scalars().all()
-        
-        if not ads:
+        """Build performance metrics for a variant from pre-fetched sums."""
+        metrics = metrics_by_creative.get(creative_id) if creative_id else None
+        if metrics is None:
             return VariantResult(
                 variant_name=variant_name,
                 creative_id=creative_id,
@@ -313,25 +367,11 @@ class ExperimentRunnerService:
                 spend=0, ctr=0, cvr=0, cpl=0
             )
         
-        # Get metrics
-        query = select(
-            func.sum(MarketingMetric.impressions).label('impressions'),
-            func.sum(MarketingMetric.clicks).label('clicks'),
-            func.sum(MarketingMetric.leads).label('leads'),
-            func.sum(MarketingMetric.closed_won).label('conversions'),
-            func.sum(MarketingMetric.spend).label('spend')
-        ).where(MarketingMetric.ad_id.in_(ads))
-        
-        if start_date:
-            query = query.where(MarketingMetric.date >= start_date.date())
-        
-        metrics = self.db.execute(query).first()
-        
-        impressions = metrics.impressions or 0
-        clicks = metrics.clicks or 0
-        leads = metrics.leads or 0
-        conversions = metrics.conversions or 0
-        spend = float(metrics.spend or 0)
+        impressions = metrics.impressions
+        clicks = metrics.clicks
+        leads = metrics.leads
+        conversions = metrics.conversions
+        spend = float(metrics.spend)
         
         return VariantResult(
             variant_name=variant_name,
@@ -384,11 +424,11 @@ class ExperimentRunnerService:
         # Z-statistic
         z = (p2 - p1) / se
         
-        # Two-tailed p-value
-        p_value = 2 * (1 - stats.norm.cdf(abs(z)))
+        # Two-tailed p-value: 2 * (1 - Phi(|z|)) == erfc(|z| / sqrt(2))
+        p_value = math.erfc(abs(z) / math.sqrt(2))
         
         # 95% confidence interval for difference
-        z_95 = 1.96
+        z_95 = _z_crit(0.05)
         diff = p2 - p1
         ci_lower = diff - z_95 * se
         ci_upper = diff + z_95 * se
@@ -401,9 +441,10 @@ class ExperimentRunnerService:
         is_significant: bool,
         winner: Optional[str],
         lift: float,
-        sample_sufficient: bool
+        sample_sufficient: bool,
+        now: datetime
     ) -> str:
-        """Generate actionable recommendation."""
+        """Generate actionable recommendation as of `now`."""
         if not sample_sufficient:
             return "Continue experiment - insufficient sample size"
         
@@ -412,7 +453,7 @@ class ExperimentRunnerService:
         
         days_running = 0
         if experiment.start_date:
-            days_running = (datetime.utcnow() - experiment.start_date).days
+            days_running = (now - experiment.start_date).days
         
         if is_significant:
             if winner == "control":
@@ -538,7 +579,7 @@ class ExperimentRunnerService:
         if not experiment:
             raise ValueError(f"Experiment {experiment_id} not found")
         
-        result = self.analyze_experiment(experiment_id)
+        result = self.analyze_experiment(experiment_id, persist=False)
         stop_rules = experiment.stop_rules or {}
         
         should_stop = False
@@ -590,10 +631,28 @@ class ExperimentRunnerService:
             List of experiments that should be stopped
         """
         active = self.get_active_experiments()
-        should_stop = []
+        if not active:
+            return []
+
+        # Each check is dominated by DB round-trips, so run them concurrently.
+        # SQLAlchemy sessions are not thread-safe: every worker gets its own.
+        bind = self.db.get_bind()
+        session_factory = sessionmaker(bind=bind, autoflush=False)
+        pool_size = getattr(bind.pool, "size", lambda: self.MAX_CHECK_WORKERS)()
+        max_workers = max(1, min(pool_size, self.MAX_CHECK_WORKERS, len(active)))
+
+        checks: Dict[int, Dict[str, Any]] = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._check_in_session, session_factory, experiment.id): experiment.id
+                for experiment in active
+            }
+            for future in as_completed(futures):
+                checks[futures[future]] = future.result()
         
+        should_stop = []
         for experiment in active:
-            check = self.check_stopping_rules(experiment.id)
+            check = checks[experiment.id]
             if check["should_stop"]:
                 should_stop.append({
                     "experiment_id": experiment.id,
@@ -603,3 +662,8 @@ class ExperimentRunnerService:
         
         return should_stop
 
+    @staticmethod
+    def _check_in_session(session_factory: sessionmaker, experiment_id: int) -> Dict[str, Any]:
+        """Run stopping-rule checks for one experiment on a dedicated session."""
+        with session_factory() as db:
+            return ExperimentRunnerService(db).check_stopping_rules(experiment_id)
@@ -4,10 +4,16 @@ Lead Persona Matcher Service
 Matches incoming leads to existing marketing personas based on
 profile characteristics, enabling personalized marketing and attribution.
 """
-from typing import Dict, Any, List, Optional, Tuple
+import math
+import re
+import sys
+from decimal import Decimal
+from typing import Dict, Any, FrozenSet, Iterator, List, NamedTuple, Optional, Tuple
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy.orm import Session, selectinload, sessionmaker
+from sqlalchemy import select, func, update, and_, or_, case, Float
 import numpy as np
 
 from ...config import get_settings
@@ -29,6 +35,106 @@ class PersonaMatch:
     is_strong_match: bool
 
 
+# Property type synonyms (e.g., "apartment" partially matches "flat")
+_TYPE_SYNONYMS = {
+    "apartment": ["flat", "condo", "unit"],
+    "villa": ["house", "detached", "standalone"],
+    "townhouse": ["townhome", "row house", "terrace"],
+    "penthouse": ["apartment", "flat", "luxury"],
+    "studio": ["apartment", "flat", "unit"]
+}
+
+
+def _build_synonym_index(synonyms: Dict[str, List[str]]) -> Dict[str, FrozenSet[str]]:
+    """Map each type to every type it partially matches, in both directions."""
+    index: Dict[str, set] = defaultdict(set)
+    for canonical, related in synonyms.items():
+        index[canonical].update(related)
+        for syn in related:
+            index[syn].add(canonical)
+    return {key: frozenset(values) for key, values in index.items()}
+
+
+_TYPE_SYNONYM_INDEX = _build_synonym_index(_TYPE_SYNONYMS)
+
+# Set-bit counts for every uint8 value
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.int64)
+
+
+class ProfileView(NamedTuple):
+    """
+    Plain projection of the LeadProfile fields used for matching.
+
+    Built once per lead so scoring reads tuple fields instead of going
+    through instrumented ORM attributes for every persona. Hashable, so
+    identical profiles collapse to one key.
+    """
+    budget_min: Optional[Decimal]
+    budget_max: Optional[Decimal]
+    property_type: Optional[str]
+    city: Optional[str]
+    areas: Tuple[str, ...]
+    move_in_date: Optional[str]
+    preapproved: Optional[bool]
+
+    @classmethod
+    def from_profile(cls, profile: LeadProfile) -> "ProfileView":
+        return cls(
+            budget_min=profile.budget_min,
+            budget_max=profile.budget_max,
+            property_type=profile.property_type,
+            city=profile.city,
+            areas=tuple(profile.areas or ()),
+            move_in_date=profile.move_in_date,
+            preapproved=profile.preapproved,
+        )
+
+
+@dataclass(frozen=True)
+class PersonaIndex:
+    """
+    Plain snapshot of a persona's matching inputs.
+
+    Everything scoring needs is derived here once per matcher, so scoring
+    never touches ORM state (which may be expired by a commit) and never
+    re-reads rules/characteristics or re-normalizes persona strings.
+    """
+    id: int
+    name: str
+    budget_range: Optional[Tuple[float, float]]
+    property_types: FrozenSet[str]  # lowercased, interned
+    locations: FrozenSet[str]  # lowercased, interned
+    urgency: str
+    price_sensitivity: str
+    data_points: int  # rule criteria present, for match confidence
+
+    @classmethod
+    def from_persona(cls, persona: Persona) -> "PersonaIndex":
+        rules = persona.rules or {}
+        characteristics = persona.characteristics or {}
+        budget_range = rules.get("budget_range")
+        return cls(
+            id=persona.id,
+            name=persona.name,
+            budget_range=(
+                (float(budget_range[0]), float(budget_range[1]))
+                if budget_range and len(budget_range) >= 2 else None
+            ),
+            property_types=frozenset(
+                sys.intern(t.lower().strip()) for t in rules.get("property_types") or []
+            ),
+            locations=frozenset(
+                sys.intern(l.lower().strip()) for l in rules.get("locations") or []
+            ),
+            urgency=characteristics.get("urgency", "medium"),
+            price_sensitivity=characteristics.get("price_sensitivity", "medium"),
+            data_points=sum(
+                bool(rules.get(key))
+                for key in ("budget_range", "property_types", "locations", "urgency")
+            ),
+        )
+
+
 class LeadPersonaMatcherService:
     """
     Matches leads to marketing personas.
@@ -55,17 +161,47 @@ class LeadPersonaMatcherService:
         "financing": 0.15
     }
     
+    # Ordinal urgency levels (adjacent levels score as a partial match)
+    _URGENCY_LEVELS = ("low", "medium", "high")
+
+    # Keyword groups checked in priority order; the first group found anywhere
+    # in the text wins, so these stay separate patterns rather than one alternation
+    _URGENCY_PATTERNS = tuple(
+        (re.compile("|".join(map(re.escape, words))), urgency)
+        for words, urgency in (
+            (("immediately", "asap", "urgent", "now"), "high"),
+            (("flexible", "no rush", "within a year"), "low"),
+            (("1 month", "30 days", "next month"), "high"),
+            (("3 month", "6 month"), "medium"),
+        )
+    )
+
+    # Factor order used by the vectorized (leads x personas) scoring path
+    FACTOR_KEYS = ("budget", "property_type", "location", "urgency", "financing")
+    _WEIGHT_VECTOR = tuple(map(MATCH_WEIGHTS.__getitem__, FACTOR_KEYS))
+
+    # Float slack so early exit never drops a pair that would tie min_score
+    _PRUNE_SLACK = 1e-9
+
     # Threshold for strong match
     STRONG_MATCH_THRESHOLD = 70
     
+    # Leads loaded and scored at a time by iter_batch_matches
+    BATCH_CHUNK_SIZE = 1000
+
+    # Upper bound on chunks scored concurrently (one pooled connection each)
+    MAX_MATCH_WORKERS = 4
+
     def __init__(self, db: Session):
         self.db = db
+        self._active_personas_cache: Optional[List[PersonaIndex]] = None
     
     def match_lead_to_personas(
         self,
         lead_id: int,
         auto_assign: bool = True,
-        min_score: float = 50.0
+        min_score: float = 50.0,
+        defer_commit: bool = False
     ) -> List[PersonaMatch]:
         """
         Match a lead to existing personas.
@@ -74,6 +210,7 @@ class LeadPersonaMatcherService:
             lead_id: Lead to match
             auto_assign: If True, assign best match to lead
             min_score: Minimum match score to consider
+            defer_commit: If True, leave the assignment for the caller to commit
         
         Returns:
             List of PersonaMatch objects, sorted by score
@@ -91,32 +228,21 @@ class LeadPersonaMatcherService:
             return []
         
         # Fetch active personas
-        personas = self.db.execute(
-            select(Persona).where(
-                Persona.status.in_([PersonaStatus.ACTIVE, PersonaStatus.DRAFT])
-            )
-        ).scalars().all()
+        personas = self._get_active_personas()
         
         if not personas:
             logger.warning("no_personas_found")
             return []
         
-        # Calculate match score for each persona
-        matches = []
-        for persona in personas:
-            match = self._calculate_match(lead, profile, persona)
-            if match.match_score >= min_score:
-                matches.append(match)
-        
-        # Sort by score descending
-        matches.sort(key=lambda x: x.match_score, reverse=True)
+        matches = self._match_profile(lead, ProfileView.from_profile(profile), personas, min_score)
         
         # Auto-assign best match if enabled
         if auto_assign and matches:
             best_match = matches[0]
             if best_match.is_strong_match:
                 lead.marketing_persona_id = best_match.persona_id
-                self.db.commit()
+                if not defer_commit:
+                    self.db.commit()
                 logger.info("lead_persona_assigned",
                            lead_id=lead_id,
                            persona_id=best_match.persona_id,
@@ -128,59 +254,125 @@ class LeadPersonaMatcherService:
         
         return matches
     
+    def _get_active_personas(self) -> List[PersonaIndex]:
+        """
+        Get personas eligible for matching.
+
+        Loaded once per service instance; call invalidate_persona_cache()
+        after creating or editing personas through the same instance.
+        """
+        if self._active_personas_cache is None:
+            personas = self.db.execute(
+                select(Persona).where(
+                    Persona.status.in_([PersonaStatus.ACTIVE, PersonaStatus.DRAFT])
+                )
+            ).scalars().all()
+            self._active_personas_cache = []
+            for persona in personas:
+                # A malformed persona is left out rather than failing every match
+                try:
+                    self._active_personas_cache.append(PersonaIndex.from_persona(persona))
+                except Exception as e:
+                    logger.error("persona_index_failed", persona_id=persona.id, error=str(e))
+        return self._active_personas_cache
+
+    def invalidate_persona_cache(self) -> None:
+        """Drop cached personas so the next match reloads them."""
+        self._active_personas_cache = None
+
+    def _match_profile(
+        self,
+        lead: Lead,
+        profile: ProfileView,
+        personas: List[PersonaIndex],
+        min_score: float
+    ) -> List[PersonaMatch]:
+        """Score a loaded lead profile against loaded personas, best first."""
+        matches = []
+        for persona in personas:
+            match = self._calculate_match(lead, profile, persona, min_score)
+            if match is not None and match.match_score >= min_score:
+                matches.append(match)
+
+        # Sort by score descending
+        matches.sort(key=lambda x: x.match_score, reverse=True)
+        return matches
+
     def _calculate_match(
         self,
         lead: Lead,
-        profile: LeadProfile,
-        persona: Persona
-    ) -> PersonaMatch:
-        """Calculate match score between a lead and persona."""
-        rules = persona.rules or {}
-        characteristics = persona.characteristics or {}
+        profile: ProfileView,
+        persona: PersonaIndex,
+        min_score: Optional[float] = None
+    ) -> Optional[PersonaMatch]:
+        """
+        Calculate match score between a lead and persona.
+
+        Factors are scored in descending weight order. When min_score is
+        given, returns None as soon as the remaining factors could not lift
+        the score to min_score even if they were all perfect.
+        """
+        w_budget, w_type, w_location, w_urgency, w_financing = self._WEIGHT_VECTOR
+        floor = None if min_score is None else min_score / 100 - self._PRUNE_SLACK
         
-        # Calculate individual factor scores (0-1)
+        # Calculate individual factor scores (0-1), keeping a running
+        # weighted sum and the best the remaining factors could add
         factors = {}
         
         # 1. Budget match
         factors["budget"] = self._calculate_budget_match(
             profile.budget_min,
             profile.budget_max,
-            rules.get("budget_range")
+            persona.budget_range
         )
+        weighted = factors["budget"] * w_budget
+        remaining = w_type + w_location + w_urgency + w_financing
+        if floor is not None and weighted + remaining < floor:
+            return None
         
         # 2. Property type match
         factors["property_type"] = self._calculate_property_type_match(
             profile.property_type,
-            rules.get("property_types", [])
+            persona.property_types
         )
+        weighted += factors["property_type"] * w_type
+        remaining -= w_type
+        if floor is not None and weighted + remaining < floor:
+            return None
         
         # 3. Location match
         factors["location"] = self._calculate_location_match(
             profile.city,
-            profile.areas or [],
-            rules.get("locations", [])
+            profile.areas,
+            persona.locations
         )
+        weighted += factors["location"] * w_location
+        remaining -= w_location
+        if floor is not None and weighted + remaining < floor:
+            return None
         
         # 4. Urgency match
         factors["urgency"] = self._calculate_urgency_match(
             profile.move_in_date,
-            characteristics.get("urgency", "medium")
+            persona.urgency
         )
+        weighted += factors["urgency"] * w_urgency
+        remaining -= w_urgency
+        if floor is not None and weighted + remaining < floor:
+            return None
         
         # 5. Financing match
         factors["financing"] = self._calculate_financing_match(
             profile.preapproved,
-            characteristics.get("price_sensitivity", "medium")
+            persona.price_sensitivity
         )
+        weighted += factors["financing"] * w_financing
         
-        # Calculate weighted score
-        match_score = sum(
-            factors[k] * self.MATCH_WEIGHTS[k]
-            for k in factors
-        ) * 100
+        # Weighted score, accumulated in FACTOR_KEYS order
+        match_score = weighted * 100
         
         # Calculate confidence based on data availability
-        confidence = self._calculate_confidence(profile, rules)
+        confidence = self._calculate_confidence(profile, persona.data_points)
         
         return PersonaMatch(
             persona_id=persona.id,
@@ -195,7 +387,7 @@ class LeadPersonaMatcherService:
         self,
         lead_min: Optional[float],
         lead_max: Optional[float],
-        persona_range: Optional[List[float]]
+        persona_range: Optional[Tuple[float, float]]
     ) -> float:
         """Calculate budget range overlap score."""
         if not lead_min and not lead_max:
@@ -232,9 +424,9 @@ class LeadPersonaMatcherService:
     def _calculate_property_type_match(
         self,
         lead_type: Optional[str],
-        persona_types: List[str]
+        persona_types: FrozenSet[str]
     ) -> float:
-        """Calculate property type match score."""
+        """Calculate property type match score (persona_types pre-normalized)."""
         if not lead_type:
             return 0.5  # No data
         
@@ -242,41 +434,24 @@ class LeadPersonaMatcherService:
             return 0.5  # No persona types defined
         
         lead_type_lower = lead_type.lower().strip()
-        persona_types_lower = [t.lower().strip() for t in persona_types]
         
         # Exact match
-        if lead_type_lower in persona_types_lower:
+        if lead_type_lower in persona_types:
             return 1.0
         
-        # Partial match (e.g., "apartment" matches "flat")
-        type_synonyms = {
-            "apartment": ["flat", "condo", "unit"],
-            "villa": ["house", "detached", "standalone"],
-            "townhouse": ["townhome", "row house", "terrace"],
-            "penthouse": ["apartment", "flat", "luxury"],
-            "studio": ["apartment", "flat", "unit"]
-        }
-        
-        synonyms = type_synonyms.get(lead_type_lower, [])
-        for syn in synonyms:
-            if syn in persona_types_lower:
-                return 0.8
-        
-        # Check if persona synonyms match lead type
-        for persona_type in persona_types_lower:
-            persona_synonyms = type_synonyms.get(persona_type, [])
-            if lead_type_lower in persona_synonyms:
-                return 0.8
+        # Partial match in either direction (e.g., "apartment" matches "flat")
+        if not _TYPE_SYNONYM_INDEX.get(lead_type_lower, frozenset()).isdisjoint(persona_types):
+            return 0.8
         
         return 0.3  # No match
     
     def _calculate_location_match(
         self,
         lead_city: Optional[str],
-        lead_areas: List[str],
-        persona_locations: List[str]
+        lead_areas: Tuple[str, ...],
+        persona_locations: FrozenSet[str]
     ) -> float:
-        """Calculate location match score."""
+        """Calculate location match score (persona_locations pre-normalized)."""
         if not lead_city and not lead_areas:
             return 0.5  # No data
         
@@ -288,15 +463,14 @@ class LeadPersonaMatcherService:
             all_lead_locations.append(lead_city.lower().strip())
         all_lead_locations.extend([a.lower().strip() for a in lead_areas])
         
-        persona_locations_lower = [l.lower().strip() for l in persona_locations]
-        
-        # Count matches
+        # Count matches: exact hits via hash lookup, containment as fallback
         matches = 0
         for loc in all_lead_locations:
-            for persona_loc in persona_locations_lower:
-                if loc in persona_loc or persona_loc in loc:
-                    matches += 1
-                    break
+            if loc in persona_locations or any(
+                loc in persona_loc or persona_loc in loc
+                for persona_loc in persona_locations
+            ):
+                matches += 1
         
         if matches == 0:
             return 0.3  # No location match
@@ -314,28 +488,28 @@ class LeadPersonaMatcherService:
         if not move_in_date:
             return 0.5  # No data
         
-        move_in_lower = move_in_date.lower()
+        lead_urgency = self._lead_urgency(move_in_date)
         
-        # Determine lead urgency
-        lead_urgency = "medium"
-        if any(word in move_in_lower for word in ["immediately", "asap", "urgent", "now"]):
-            lead_urgency = "high"
-        elif any(word in move_in_lower for word in ["flexible", "no rush", "within a year"]):
-            lead_urgency = "low"
-        elif any(word in move_in_lower for word in ["1 month", "30 days", "next month"]):
-            lead_urgency = "high"
-        elif any(word in move_in_lower for word in ["3 month", "6 month"]):
-            lead_urgency = "medium"
-        
-        # Match urgencies
+        # Match urgencies; an unknown persona urgency scores as opposite
         if lead_urgency == persona_urgency:
             return 1.0
-        elif abs(["low", "medium", "high"].index(lead_urgency) - 
-                 ["low", "medium", "high"].index(persona_urgency)) == 1:
+        elif (persona_urgency in self._URGENCY_LEVELS
+              and abs(self._URGENCY_LEVELS.index(lead_urgency) -
+                      self._URGENCY_LEVELS.index(persona_urgency)) == 1):
             return 0.7  # Adjacent urgency levels
         else:
             return 0.4  # Opposite urgency
     
+    @staticmethod
+    def _lead_urgency(move_in_date: str) -> str:
+        """Classify a free-text move-in timeline as low/medium/high urgency."""
+        move_in_lower = move_in_date.lower()
+
+        for pattern, urgency in LeadPersonaMatcherService._URGENCY_PATTERNS:
+            if pattern.search(move_in_lower):
+                return urgency
+        return "medium"
+
     def _calculate_financing_match(
         self,
         preapproved: Optional[bool],
@@ -363,8 +537,8 @@ class LeadPersonaMatcherService:
     
     def _calculate_confidence(
         self,
-        profile: LeadProfile,
-        rules: Dict[str, Any]
+        profile: ProfileView,
+        persona_data_points: int
     ) -> float:
         """Calculate confidence based on data availability."""
         lead_data_points = 0
@@ -379,63 +553,550 @@ class LeadPersonaMatcherService:
         if profile.preapproved is not None:
             lead_data_points += 1
         
-        persona_data_points = 0
-        if rules.get("budget_range"):
-            persona_data_points += 1
-        if rules.get("property_types"):
-            persona_data_points += 1
-        if rules.get("locations"):
-            persona_data_points += 1
-        if rules.get("urgency"):
-            persona_data_points += 1
-        
         total_possible = 5
         data_availability = (lead_data_points + persona_data_points) / (total_possible * 2)
         
         return min(1.0, data_availability + 0.2)
     
+    def _score_matrix(
+        self,
+        profiles: List[ProfileView],
+        personas: List[PersonaIndex]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Score every (lead, persona) pair at once.
+
+        Vectorized equivalent of calling _calculate_match for each pair.
+
+        Returns:
+            (scores[L, P] in 0-100, factors[L, P, 5] in FACTOR_KEYS order,
+            confidence[L, P])
+        """
+        n_leads, n_personas = len(profiles), len(personas)
+
+        # Factor-major planes keep each factor contiguous; returned as a
+        # [L, P, 5] view below
+        planes = np.empty((len(self.FACTOR_KEYS), n_leads, n_personas))
+
+        # 1. Budget overlap over the full grid
+        # Missing budgets load as NaN; 0 and missing both mean "not given"
+        budget_min = np.nan_to_num(np.array([p.budget_min for p in profiles], dtype=float))
+        budget_max = np.nan_to_num(np.array([p.budget_max for p in profiles], dtype=float))
+        lead_has_budget = (budget_min != 0) | (budget_max != 0)
+        lead_min = budget_min
+        lead_max = np.where(budget_max != 0, budget_max, budget_min * 1.5)
+        persona_has_range = np.array([p.budget_range is not None for p in personas])
+        persona_min = np.array([p.budget_range[0] if p.budget_range else 0.0 for p in personas])
+        persona_max = np.array([p.budget_range[1] if p.budget_range else 0.0 for p in personas])
+
+        lmin, lmax = lead_min[:, None], lead_max[:, None]
+        pmin, pmax = persona_min[None, :], persona_max[None, :]
+        persona_range_size = np.maximum(pmax - pmin, 1)
+        lead_range_size = np.maximum(lmax - lmin, 1)
+
+        # Computed in place over two scratch grids plus the output plane
+        budget = planes[0]
+        low = np.maximum(lmin, pmin)
+        high = np.minimum(lmax, pmax)
+        no_overlap = high <= low
+
+        # Overlap score: (overlap / lead range + overlap / persona range) / 2
+        np.subtract(high, low, out=high)
+        np.divide(high, lead_range_size, out=budget)
+        np.divide(high, persona_range_size, out=high)
+        budget += high
+        budget /= 2
+
+        # Gap score for disjoint ranges: max(0, 1 - gap / persona range * 0.5)
+        np.subtract(lmin, pmax, out=low)
+        np.abs(low, out=low)
+        np.subtract(lmax, pmin, out=high)
+        np.abs(high, out=high)
+        np.minimum(low, high, out=low)
+        low /= persona_range_size
+        low *= 0.5
+        np.subtract(1.0, low, out=low)
+        np.maximum(0.0, low, out=low)
+        np.copyto(budget, low, where=no_overlap)
+        np.copyto(budget, 0.5, where=~(lead_has_budget[:, None] & persona_has_range[None, :]))
+
+        # 2. Property type: integer-encode normalized types so exact and
+        # synonym hits become boolean lookups (code -1 = no lead type)
+        codes: Dict[str, int] = {}
+        lead_type_codes = np.array([
+            codes.setdefault(p.property_type.lower().strip(), len(codes)) if p.property_type else -1
+            for p in profiles
+        ])
+        persona_type_codes = [
+            [codes.setdefault(t, len(codes)) for t in p.property_types] for p in personas
+        ]
+        # One spare trailing column so code -1 indexes an all-False entry
+        type_members = np.zeros((n_personas, len(codes) + 1), dtype=bool)
+        for j, type_codes in enumerate(persona_type_codes):
+            type_members[j, type_codes] = True
+        type_synonyms = np.zeros((len(codes) + 1, len(codes) + 1), dtype=bool)
+        for type_name, code in codes.items():
+            for synonym in _TYPE_SYNONYM_INDEX.get(type_name, ()):
+                if synonym in codes:
+                    type_synonyms[code, codes[synonym]] = True
+
+        exact_type = type_members[:, lead_type_codes].T
+        synonym_type = (type_synonyms[lead_type_codes].astype(np.int64) @ type_members.T) > 0
+        persona_has_types = np.array([bool(p.property_types) for p in personas])
+        planes[1] = np.where(
+            (lead_type_codes[:, None] < 0) | ~persona_has_types[None, :],
+            0.5,
+            np.select([exact_type, synonym_type], [1.0, 0.8], 0.3)
+        )
+
+        # 3. Location: score each distinct lead location set once against
+        # every persona, then broadcast back to the leads sharing it
+        planes[2] = self._score_distinct(
+            [(p.city, p.areas) for p in profiles],
+            lambda loc: [
+                self._calculate_location_match(loc[0], loc[1], p.locations)
+                for p in personas
+            ]
+        )
+
+        # 4. Urgency: distance between ordinal levels
+        lead_urgency = np.array([
+            self._URGENCY_LEVELS.index(self._lead_urgency(p.move_in_date)) if p.move_in_date else -1
+            for p in profiles
+        ])
+        persona_urgency = np.array([
+            self._URGENCY_LEVELS.index(p.urgency) if p.urgency in self._URGENCY_LEVELS else -10
+            for p in personas
+        ])
+        distance = np.abs(lead_urgency[:, None] - persona_urgency[None, :])
+        planes[3] = np.where(
+            lead_urgency[:, None] < 0,
+            0.5,
+            np.select([distance == 0, distance == 1], [1.0, 0.7], 0.4)
+        )
+
+        # 5. Financing: lookup table of (preapproved state, price sensitivity)
+        financing_table = np.array([
+            [0.5, 0.5, 0.5, 0.5],  # no data
+            [1.0, 0.7, 0.5, 0.5],  # preapproved
+            [0.5, 0.7, 0.9, 0.5],  # not preapproved
+        ])
+        lead_state = np.array([
+            0 if p.preapproved is None else (1 if p.preapproved else 2) for p in profiles
+        ])
+        sensitivity = np.array([
+            {"low": 0, "medium": 1, "high": 2}.get(p.price_sensitivity, 3)
+            for p in personas
+        ])
+        planes[4] = financing_table[lead_state[:, None], sensitivity[None, :]]
+
+        # Weighted score, accumulated in the same order as _calculate_match
+        scores = np.zeros((n_leads, n_personas))
+        weighted = np.empty_like(scores)
+        for plane, key in zip(planes, self.FACTOR_KEYS):
+            np.multiply(plane, self.MATCH_WEIGHTS[key], out=weighted)
+            scores += weighted
+        scores *= 100
+
+        # Confidence from data availability on each side: pack each lead's
+        # present fields into a bitmask, reusing the per-factor "no data"
+        # markers above, and popcount it
+        lead_has_location = np.array([bool(p.city or p.areas) for p in profiles])
+        lead_mask = (
+            lead_has_budget.astype(np.uint8)
+            | (lead_type_codes >= 0).astype(np.uint8) << 1
+            | lead_has_location.astype(np.uint8) << 2
+            | (lead_urgency >= 0).astype(np.uint8) << 3
+            | (lead_state > 0).astype(np.uint8) << 4
+        )
+        lead_points = _POPCOUNT[lead_mask]
+        persona_points = np.array([p.data_points for p in personas])
+        confidence = np.minimum(
+            1.0, (lead_points[:, None] + persona_points[None, :]) / 10 + 0.2
+        )
+
+        return scores, np.moveaxis(planes, 0, -1), confidence
+
+    @staticmethod
+    def _rank_rows(
+        scores: np.ndarray,
+        min_score: float,
+        top_k: Optional[int]
+    ) -> List[np.ndarray]:
+        """
+        Per score row, persona indices at or above min_score, best first.
+
+        Ties keep persona order, like the stable sort in the single-lead
+        path. With top_k, rows are first narrowed to scores at or above the
+        row's k-th best (found with a linear-time partition, ties included),
+        so only those few entries are sorted and the cut matches a full sort.
+        """
+        eligible = scores >= min_score
+        if top_k is not None and top_k < scores.shape[1]:
+            kth_best = -np.partition(-scores, top_k - 1, axis=1)[:, top_k - 1]
+            eligible &= scores >= kth_best[:, None]
+
+        ranked = []
+        for row, mask in zip(scores, eligible):
+            indices = np.flatnonzero(mask)
+            ranked.append(indices[np.argsort(-row[indices], kind="stable")][:top_k])
+        return ranked
+
+    @staticmethod
+    def _score_distinct(values: List[Any], score_fn) -> np.ndarray:
+        """Apply score_fn once per distinct value; rows follow `values` order."""
+        index: Dict[Any, int] = {}
+        codes = [index.setdefault(value, len(index)) for value in values]
+        table = np.array([score_fn(value) for value in index], dtype=float)
+        return table[codes]
+
+    def _build_match(
+        self,
+        persona: PersonaIndex,
+        score: float,
+        factors: np.ndarray,
+        confidence: float
+    ) -> PersonaMatch:
+        """Materialize a PersonaMatch from one cell of the score matrix."""
+        score = float(score)
+        return PersonaMatch(
+            persona_id=persona.id,
+            persona_name=persona.name,
+            match_score=score,
+            confidence=float(confidence),
+            match_factors=dict(zip(self.FACTOR_KEYS, factors.tolist())),
+            is_strong_match=score >= self.STRONG_MATCH_THRESHOLD
+        )
+
+    def _candidate_pairs(
+        self,
+        lead_ids: List[int],
+        personas: List[PersonaIndex]
+    ) -> Dict[int, set]:
+        """
+        Coarse (lead, persona) filter pushed down to Postgres.
+
+        A pair is kept when the budget ranges overlap or the lead's property
+        type is listed by the persona. Missing budget data on either side
+        counts as an overlap, mirroring the neutral score it gets.
+
+        Returns:
+            Dict of lead_id -> set of candidate persona ids (leads without a
+            profile or any candidate are absent)
+        """
+        budget_range = Persona.rules["budget_range"]
+        # Same rules as _calculate_match: 0 and missing budgets both mean
+        # "not given", and only an array of two or more bounds is a range
+        lead_min = func.coalesce(LeadProfile.budget_min, 0)
+        lead_max = func.coalesce(func.nullif(LeadProfile.budget_max, 0), lead_min * 1.5)
+        lead_has_budget = func.coalesce(
+            func.nullif(LeadProfile.budget_min, 0), func.nullif(LeadProfile.budget_max, 0)
+        ).is_not(None)
+        persona_has_range = case(
+            (func.jsonb_typeof(budget_range) == "array", func.jsonb_array_length(budget_range) >= 2),
+            else_=False,
+        )
+        budget_overlap = or_(
+            ~persona_has_range,
+            ~lead_has_budget,
+            and_(
+                lead_max >= budget_range[0].astext.cast(Float),
+                lead_min <= budget_range[1].astext.cast(Float),
+            ),
+        )
+        type_match = Persona.rules["property_types"].has_key(
+            func.lower(func.trim(LeadProfile.property_type))
+        )
+
+        rows = self.db.execute(
+            select(LeadProfile.lead_id, Persona.id)
+            .join(Persona, or_(budget_overlap, type_match))
+            .where(
+                LeadProfile.lead_id.in_(lead_ids),
+                Persona.id.in_([persona.id for persona in personas]),
+            )
+        ).all()
+
+        candidates: Dict[int, set] = defaultdict(set)
+        for lead_id, persona_id in rows:
+            candidates[lead_id].add(persona_id)
+        return candidates
+
     def batch_match_leads(
         self,
         lead_ids: Optional[List[int]] = None,
         auto_assign: bool = True,
-        min_score: float = 50.0
+        min_score: float = 50.0,
+        prefilter: bool = False,
+        top_k: Optional[int] = None
     ) -> Dict[int, List[PersonaMatch]]:
         """
         Batch match multiple leads to personas.
         
+        Collects iter_batch_matches() into one dict; prefer the iterator when
+        matching an unbounded set of leads.
+
         Args:
             lead_ids: Specific leads to match (None = all unassigned)
             auto_assign: If True, assign best matches
             min_score: Minimum match score
+            prefilter: If True, only score (lead, persona) pairs that pass the
+                coarse SQL filter in _candidate_pairs. Approximate: pairs with
+                disjoint budgets and different property types are dropped even
+                if their other factors would clear min_score.
+            top_k: Keep only each lead's best top_k matches (None = all)
         
         Returns:
             Dict of lead_id -> list of PersonaMatch
         """
-        if lead_ids is None:
-            # Get all leads without persona assignment
-            leads = self.db.execute(
-                select(Lead).where(Lead.marketing_persona_id.is_(None))
-            ).scalars().all()
-            lead_ids = [l.id for l in leads]
-        
-        results = {}
-        for lead_id in lead_ids:
-            try:
-                matches = self.match_lead_to_personas(
-                    lead_id=lead_id,
-                    auto_assign=auto_assign,
-                    min_score=min_score
-                )
-                results[lead_id] = matches
-            except Exception as e:
-                logger.error("lead_matching_failed", lead_id=lead_id, error=str(e))
-                results[lead_id] = []
+        return dict(self.iter_batch_matches(
+            lead_ids=lead_ids,
+            auto_assign=auto_assign,
+            min_score=min_score,
+            prefilter=prefilter,
+            top_k=top_k
+        ))
+
+    def iter_batch_matches(
+        self,
+        lead_ids: Optional[List[int]] = None,
+        auto_assign: bool = True,
+        min_score: float = 50.0,
+        prefilter: bool = False,
+        top_k: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        n_workers: Optional[int] = None
+    ) -> Iterator[Tuple[int, List[PersonaMatch]]]:
+        """
+        Match leads to personas chunk by chunk, yielding as each chunk finishes.
+
+        Chunks are loaded and scored concurrently on worker sessions; only a
+        bounded number of chunks is in flight at a time. Assignments are
+        written on this service's session and committed once per chunk.
+
+        Args:
+            lead_ids: Specific leads to match (None = all unassigned)
+            auto_assign: If True, assign best matches
+            min_score: Minimum match score
+            prefilter: See batch_match_leads
+            top_k: Keep only each lead's best top_k matches (None = all)
+            chunk_size: Leads loaded and scored per chunk (default BATCH_CHUNK_SIZE)
+            n_workers: Concurrent chunk workers (default MAX_MATCH_WORKERS;
+                1 scores inline on this session)
+
+        Yields:
+            (lead_id, list of PersonaMatch) pairs
+        """
+        chunk_size = chunk_size or self.BATCH_CHUNK_SIZE
+        n_workers = n_workers or self.MAX_MATCH_WORKERS
+        if lead_ids is not None:
+            n_workers = min(n_workers, math.ceil(len(lead_ids) / chunk_size))
+
+        personas = self._get_active_personas()
+        if not personas:
+            logger.warning("no_personas_found")
+
+        total_leads = 0
+        assigned = 0
+        chunks = self._iter_lead_id_chunks(lead_ids, chunk_size)
+        for chunk_ids, (results, assignments) in self._score_chunks(
+            chunks, personas, auto_assign, min_score, prefilter, top_k, n_workers
+        ):
+            # Bulk UPDATE by primary key (executemany) and a single commit per chunk
+            if assignments:
+                self.db.execute(update(Lead), assignments)
+                self.db.commit()
+
+            total_leads += len(chunk_ids)
+            assigned += sum(1 for matches in results.values() if matches and matches[0].is_strong_match)
+            yield from results.items()
         
         logger.info("batch_matching_completed",
-                   total_leads=len(lead_ids),
-                   assigned=sum(1 for matches in results.values() if matches and matches[0].is_strong_match))
+                   total_leads=total_leads,
+                   assigned=assigned)
+
+    def _score_chunks(
+        self,
+        chunks: Iterator[List[int]],
+        personas: List[PersonaIndex],
+        auto_assign: bool,
+        min_score: float,
+        prefilter: bool,
+        top_k: Optional[int],
+        n_workers: int
+    ) -> Iterator[Tuple[List[int], Tuple[Dict[int, List[PersonaMatch]], List[Dict[str, int]]]]]:
+        """Score chunks in order, on worker sessions when n_workers > 1."""
+        if n_workers <= 1:
+            for chunk_ids in chunks:
+                yield chunk_ids, self._score_chunk(
+                    chunk_ids, personas, auto_assign, min_score, prefilter, top_k
+                )
+            return
+
+        # Loading and materializing leads is dominated by DB round-trips, so
+        # overlap chunks across threads. Sessions are not thread-safe: every
+        # worker gets its own.
+        bind = self.db.get_bind()
+        session_factory = sessionmaker(bind=bind, autoflush=False)
+        pool_size = getattr(bind.pool, "size", lambda: n_workers)()
+        max_workers = max(1, min(pool_size, n_workers))
         
-        return results
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            for chunk_ids in chunks:
+                pending.append((chunk_ids, executor.submit(
+                    self._score_chunk_in_session, session_factory, chunk_ids,
+                    personas, auto_assign, min_score, prefilter, top_k
+                )))
+                if len(pending) >= max_workers:
+                    chunk_ids, future = pending.popleft()
+                    yield chunk_ids, future.result()
+            while pending:
+                chunk_ids, future = pending.popleft()
+                yield chunk_ids, future.result()
+
+    @staticmethod
+    def _score_chunk_in_session(
+        session_factory: sessionmaker,
+        lead_ids: List[int],
+        personas: List[PersonaIndex],
+        auto_assign: bool,
+        min_score: float,
+        prefilter: bool,
+        top_k: Optional[int]
+    ) -> Tuple[Dict[int, List[PersonaMatch]], List[Dict[str, int]]]:
+        """Score one chunk of leads on a dedicated session."""
+        with session_factory() as db:
+            return LeadPersonaMatcherService(db)._score_chunk(
+                lead_ids, personas, auto_assign, min_score, prefilter, top_k
+            )
+
+    def _iter_lead_id_chunks(
+        self,
+        lead_ids: Optional[List[int]],
+        chunk_size: int
+    ) -> Iterator[List[int]]:
+        """Yield lead ids in chunks; unassigned leads are paged by id."""
+        if lead_ids is not None:
+            for offset in range(0, len(lead_ids), chunk_size):
+                yield lead_ids[offset:offset + chunk_size]
+            return
+
+        # Keyset pagination rather than a server-side cursor, which would
+        # not survive the per-chunk commits
+        last_id = 0
+        while True:
+            chunk_ids = self.db.execute(
+                select(Lead.id)
+                .where(Lead.marketing_persona_id.is_(None), Lead.id > last_id)
+                .order_by(Lead.id)
+                .limit(chunk_size)
+            ).scalars().all()
+            if not chunk_ids:
+                return
+            yield chunk_ids
+            last_id = chunk_ids[-1]
+
+    def _score_chunk(
+        self,
+        lead_ids: List[int],
+        personas: List[PersonaIndex],
+        auto_assign: bool,
+        min_score: float,
+        prefilter: bool,
+        top_k: Optional[int]
+    ) -> Tuple[Dict[int, List[PersonaMatch]], List[Dict[str, int]]]:
+        """
+        Load and score one chunk of leads without writing anything.
+
+        Returns:
+            (lead_id -> matches, bulk-update rows for best-match assignments)
+        """
+        candidates: Optional[Dict[int, set]] = None
+        load_ids = lead_ids
+        if prefilter and personas and lead_ids:
+            candidates = self._candidate_pairs(lead_ids, personas)
+            load_ids = list(candidates)
+
+        leads = self.db.execute(
+            select(Lead)
+            .options(selectinload(Lead.profile))
+            .where(Lead.id.in_(load_ids))
+        ).scalars().all() if load_ids else []
+
+        results: Dict[int, List[PersonaMatch]] = {lead_id: [] for lead_id in lead_ids}
+        assignments: List[Dict[str, int]] = []
+        scorable = [lead for lead in leads if lead.profile] if personas else []
+        if not scorable:
+            return results, assignments
+
+        try:
+            scored, assignments = self._score_leads(
+                scorable, personas, candidates, auto_assign, min_score, top_k
+            )
+        except Exception as e:
+            # Fall back to scoring leads one at a time, so a bad profile only
+            # loses its own matches
+            logger.warning("lead_matching_chunk_failed", leads=len(scorable), error=str(e))
+            scored, assignments = {}, []
+            for lead in scorable:
+                try:
+                    lead_scored, lead_assignments = self._score_leads(
+                        [lead], personas, candidates, auto_assign, min_score, top_k
+                    )
+                except Exception as e:
+                    logger.error("lead_matching_failed", lead_id=lead.id, error=str(e))
+                    continue
+                scored.update(lead_scored)
+                assignments.extend(lead_assignments)
+
+        results.update(scored)
+        return results, assignments
+
+    def _score_leads(
+        self,
+        leads: List[Lead],
+        personas: List[PersonaIndex],
+        candidates: Optional[Dict[int, set]],
+        auto_assign: bool,
+        min_score: float,
+        top_k: Optional[int]
+    ) -> Tuple[Dict[int, List[PersonaMatch]], List[Dict[str, int]]]:
+        """
+        Score loaded leads (all with profiles) against personas in one matrix.
+
+        Returns:
+            (lead_id -> matches, bulk-update rows for best-match assignments)
+        """
+        # Leads with identical profiles score identically: score each
+        # distinct profile view once and share its row
+        rows: Dict[ProfileView, int] = {}
+        lead_rows = []
+        for lead in leads:
+            lead_rows.append(rows.setdefault(ProfileView.from_profile(lead.profile), len(rows)))
+        unique_profiles = list(rows)
+
+        scores, factors, confidence = self._score_matrix(unique_profiles, personas)
+        # With the prefilter, candidates differ per lead, so the top_k cut
+        # has to wait until after filtering
+        ranked = self._rank_rows(scores, min_score, None if candidates is not None else top_k)
+
+        results: Dict[int, List[PersonaMatch]] = {}
+        assignments: List[Dict[str, int]] = []
+        for lead, i in zip(leads, lead_rows):
+            order = ranked[i]
+            if candidates is not None:
+                allowed = candidates[lead.id]
+                order = [j for j in order if personas[j].id in allowed][:top_k]
+            matches = [
+                self._build_match(personas[j], scores[i, j], factors[i, j], confidence[i, j])
+                for j in order
+            ]
+            results[lead.id] = matches
+            if auto_assign and matches and matches[0].is_strong_match:
+                assignments.append({"id": lead.id, "marketing_persona_id": matches[0].persona_id})
+
+        return results, assignments
     
     def get_persona_lead_distribution(self) -> Dict[int, Dict[str, Any]]:
         """
@@ -448,33 +1109,25 @@ class LeadPersonaMatcherService:
             select(Persona).where(Persona.status == PersonaStatus.ACTIVE)
         ).scalars().all()
         
+        # Lead counts per persona in one grouped query (NULL = unassigned)
+        counts = dict(self.db.execute(
+            select(Lead.marketing_persona_id, func.count(Lead.id))
+            .group_by(Lead.marketing_persona_id)
+        ).all())
+
         distribution = {}
         
         for persona in personas:
-            # Count leads assigned to this persona
-            lead_count = self.db.execute(
-                select(func.count(Lead.id)).where(
-                    Lead.marketing_persona_id == persona.id
-                )
-            ).scalar()
-            
             distribution[persona.id] = {
                 "name": persona.name,
-                "lead_count": lead_count or 0,
+                "lead_count": counts.get(persona.id, 0),
                 "sample_size": persona.sample_size,
                 "status": persona.status.value
             }
         
-        # Count unassigned leads
-        unassigned = self.db.execute(
-            select(func.count(Lead.id)).where(
-                Lead.marketing_persona_id.is_(None)
-            )
-        ).scalar()
-        
         distribution[0] = {
             "name": "Unassigned",
-            "lead_count": unassigned or 0,
+            "lead_count": counts.get(None, 0),
             "sample_size": 0,
             "status": "n/a"
         }
@@ -4,25 +4,49 @@ Learning Service
 Implements the learning and adaptation loop for the marketing agent.
 Tracks performance, learns from results, and refines personas and creatives.
 """
-from typing import Dict, Any, List, Optional, Tuple
+import re
+from typing import Callable, Dict, Any, FrozenSet, List, Optional, Tuple
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from datetime import date, datetime, timedelta, timezone
 import numpy as np
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func, update
+from sqlalchemy.orm import Session, load_only, raiseload, sessionmaker
+from sqlalchemy import select, func, update, case, cast, bindparam, any_, ARRAY, Float, Integer
 
 from ...config import get_settings
 from ...logging import get_logger
 from ...models import (
     Persona, PersonaStatus, Creative, CreativeStatus,
     Campaign, AdSet, Ad, MarketingMetric,
-    CampaignPlatform, CampaignStatus
+    CampaignStatus
 )
 
 settings = get_settings()
 logger = get_logger(__name__)
 
 
+@lru_cache(maxsize=256)
+def _hook_matcher(terms: Tuple[str, ...]) -> Callable[[str], FrozenSet[str]]:
+    """
+    Compile lowercased hook terms into a single-pass substring matcher (cached).
+
+    The lookahead alternation tries the longest term first at every position,
+    so any term occurring in the text is a prefix of the term captured where
+    it starts. Expanding each captured term to the terms it contains therefore
+    yields exactly the terms for which `term in text` holds.
+    """
+    unique = sorted(set(terms), key=len, reverse=True)
+    pattern = re.compile("(?=(" + "|".join(map(re.escape, unique)) + "))")
+    contained = {term: frozenset(t for t in unique if t in term) for term in unique}
+
+    def match(text: str) -> FrozenSet[str]:
+        return frozenset().union(*(contained[term] for term in set(pattern.findall(text))))
+
+    return match
+
+
 @dataclass
 class CreativePerformance:
     """Performance data for a creative."""
@@ -95,13 +119,20 @@ class LearningService:
     MIN_IMPRESSIONS_FOR_LEARNING = 1000
     MIN_LEADS_FOR_CONFIDENCE = 20
     
+    # Platforms compared when picking a persona's best platform
+    PLATFORMS = ("meta", "google", "tiktok")
+
+    # Read-only analysis stages that can run concurrently
+    MAX_LEARNING_WORKERS = 3
+
     def __init__(self, db: Session):
         self.db = db
     
     def run_learning_cycle(
         self,
         lookback_days: int = 7,
-        auto_apply: bool = False
+        auto_apply: bool = False,
+        n_workers: int = 1
     ) -> LearningCycleResult:
         """
         Run a complete learning cycle.
@@ -109,30 +140,35 @@ class LearningService:
         Args:
             lookback_days: Days of data to analyze
             auto_apply: If True, automatically apply learnings
+            n_workers: Run the read-only analysis stages concurrently on this
+                many worker sessions (capped at MAX_LEARNING_WORKERS). Worker
+                sessions only see committed data.
         
         Returns:
             LearningCycleResult with insights and actions
         """
-        cycle_id = f"learn_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
-        logger.info("learning_cycle_started", cycle_id=cycle_id)
+        # One clock reading for the whole cycle, as naive UTC so timestamps
+        # serialize without an offset like datetime.utcnow() values did
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        cutoff_date = now.date() - timedelta(days=lookback_days)
         
-        # 1. Analyze creative performance
-        creative_rankings = self._analyze_creative_performance(lookback_days)
+        cycle_id = f"learn_{now.strftime('%Y%m%d_%H%M%S')}"
+        logger.info("learning_cycle_started", cycle_id=cycle_id)
         
-        # 2. Generate persona insights
-        insights = self._generate_persona_insights(lookback_days)
+        # 1. Analyze creative performance, 2. generate persona insights and
+        # 3. calculate improvements - independent reads of committed metrics
+        creative_rankings, insights, improvements = self._run_analysis_stages(
+            cutoff_date, lookback_days, n_workers
+        )
         
-        # 3. Determine and optionally apply actions
+        # 4. Determine and optionally apply actions
         actions = []
         if auto_apply:
-            actions = self._apply_learnings(creative_rankings, insights)
-        
-        # 4. Calculate improvements
-        improvements = self._calculate_improvements(lookback_days)
+            actions = self._apply_learnings(creative_rankings, insights, now)
         
         result = LearningCycleResult(
             cycle_id=cycle_id,
-            timestamp=datetime.utcnow(),
+            timestamp=now,
             personas_analyzed=len(insights),
             creatives_analyzed=sum(len(v) for v in creative_rankings.values()),
             insights=insights,
@@ -148,171 +184,245 @@ class LearningService:
         
         return result
     
+    def _run_analysis_stages(
+        self,
+        cutoff_date: date,
+        lookback_days: int,
+        n_workers: int
+    ) -> Tuple[Dict[int, List[CreativePerformance]], List[PersonaInsight], Dict[str, float]]:
+        """Run the read-only analysis stages, on worker sessions when n_workers > 1."""
+        stages = [
+            ("_analyze_creative_performance", (cutoff_date,)),
+            ("_generate_persona_insights", (cutoff_date,)),
+            ("_calculate_improvements", (cutoff_date, lookback_days)),
+        ]
+
+        if n_workers <= 1:
+            return tuple(getattr(self, stage)(*args) for stage, args in stages)
+
+        # Each stage is a few DB round-trips, so overlap them across threads.
+        # Sessions are not thread-safe: every worker gets its own.
+        bind = self.db.get_bind()
+        session_factory = sessionmaker(bind=bind, autoflush=False)
+        pool_size = getattr(bind.pool, "size", lambda: n_workers)()
+        max_workers = max(1, min(pool_size, n_workers, self.MAX_LEARNING_WORKERS))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self._run_stage_in_session, session_factory, stage, args)
+                for stage, args in stages
+            ]
+            return tuple(future.result() for future in futures)
+
+    @classmethod
+    def _run_stage_in_session(
+        cls,
+        session_factory: sessionmaker,
+        stage: str,
+        args: Tuple[Any, ...]
+    ) -> Any:
+        """Run one analysis stage on a dedicated session."""
+        with session_factory() as db:
+            return getattr(cls(db), stage)(*args)
+
     def _analyze_creative_performance(
         self,
-        lookback_days: int
+        cutoff_date: date
     ) -> Dict[int, List[CreativePerformance]]:
-        """Analyze performance of all creatives by persona."""
-        cutoff_date = datetime.utcnow().date() - timedelta(days=lookback_days)
-        
-        # Get all active ads with metrics
-        ads = self.db.execute(
-            select(Ad).where(
-                Ad.status.in_([CampaignStatus.ACTIVE, CampaignStatus.PAUSED])
+        """Analyze performance of all creatives by persona since cutoff_date."""
+        # Per-ad metric totals for all active/paused ads with enough volume
+        totals = (
+            select(
+                Ad.id.label('ad_id'),
+                Creative.id.label('creative_id'),
+                Creative.name.label('creative_name'),
+                Creative.persona_id.label('persona_id'),
+                func.sum(MarketingMetric.impressions).label('impressions'),
+                func.coalesce(func.sum(MarketingMetric.clicks), 0).label('clicks'),
+                func.coalesce(func.sum(MarketingMetric.spend), 0).label('spend'),
+                func.coalesce(func.sum(MarketingMetric.leads), 0).label('leads'),
+                func.coalesce(func.sum(MarketingMetric.closed_won), 0).label('conversions')
             )
-        ).scalars().all()
+            .select_from(Ad)
+            .join(Creative, Ad.creative_id == Creative.id)
+            .join(MarketingMetric, MarketingMetric.ad_id == Ad.id)
+            .where(
+                Ad.status.in_([CampaignStatus.ACTIVE, CampaignStatus.PAUSED]),
+                Creative.persona_id.is_not(None),
+                MarketingMetric.date >= cutoff_date
+            )
+            .group_by(Ad.id, Creative.id)
+            .having(func.sum(MarketingMetric.impressions) >= self.MIN_IMPRESSIONS_FOR_LEARNING)
+            .cte('creative_totals')
+        )
         
-        rankings = {}  # persona_id -> list of CreativePerformance
+        ctr, cvr, cpl, score = self._creative_score_columns(
+            totals.c.impressions, totals.c.clicks, totals.c.spend,
+            totals.c.leads, totals.c.conversions
+        )
         
-        for ad in ads:
-            creative = ad.creative
-            if not creative or not creative.persona_id:
-                continue
-            
-            # Get metrics for this ad
-            metrics = self.db.execute(
-                select(
-                    func.sum(MarketingMetric.impressions).label('impressions'),
-                    func.sum(MarketingMetric.clicks).label('clicks'),
-                    func.sum(MarketingMetric.spend).label('spend'),
-                    func.sum(MarketingMetric.leads).label('leads'),
-                    func.sum(MarketingMetric.closed_won).label('conversions')
-                ).where(
-                    MarketingMetric.ad_id == ad.id,
-                    MarketingMetric.date >= cutoff_date
-                )
-            ).first()
-            
-            if not metrics or not metrics.impressions:
-                continue
-            
-            impressions = metrics.impressions or 0
-            clicks = metrics.clicks or 0
-            spend = float(metrics.spend or 0)
-            leads = metrics.leads or 0
-            conversions = metrics.conversions or 0
-            
-            if impressions < self.MIN_IMPRESSIONS_FOR_LEARNING:
-                continue
-            
-            ctr = clicks / impressions if impressions > 0 else 0
-            cvr = conversions / leads if leads > 0 else 0
-            cpl = spend / leads if leads > 0 else 0
-            
-            # Calculate performance score
-            score = self._calculate_creative_score(ctr, cvr, cpl, impressions)
-            
-            perf = CreativePerformance(
-                creative_id=creative.id,
-                creative_name=creative.name,
-                persona_id=creative.persona_id,
-                impressions=impressions,
-                clicks=clicks,
-                leads=leads,
-                conversions=conversions,
-                spend=spend,
-                ctr=ctr,
-                cvr=cvr,
-                cpl=cpl,
-                performance_score=score,
-                rank=0  # Will be set after sorting
+        # Scored and ranked within each persona by the database; ties keep ad order
+        rank = func.row_number().over(
+            partition_by=totals.c.persona_id,
+            order_by=(score.desc(), totals.c.ad_id)
+        )
+        first_ad = func.min(totals.c.ad_id).over(partition_by=totals.c.persona_id)
+
+        ranked = self.db.execute(
+            select(
+                totals.c.creative_id,
+                totals.c.creative_name,
+                totals.c.persona_id,
+                totals.c.impressions,
+                totals.c.clicks,
+                cast(totals.c.spend, Float).label('spend'),
+                totals.c.leads,
+                totals.c.conversions,
+                ctr.label('ctr'),
+                cvr.label('cvr'),
+                cpl.label('cpl'),
+                score.label('score'),
+                rank.label('rank')
             )
-            
-            if creative.persona_id not in rankings:
-                rankings[creative.persona_id] = []
-            rankings[creative.persona_id].append(perf)
-        
-        # Sort and rank within each persona
-        for persona_id in rankings:
-            rankings[persona_id].sort(key=lambda x: x.performance_score, reverse=True)
-            for i, perf in enumerate(rankings[persona_id]):
-                perf.rank = i + 1
+            .order_by(first_ad, rank)
+        ).all()
+
+        rankings = defaultdict(list)  # persona_id -> list of CreativePerformance
+
+        for row in ranked:
+            rankings[row.persona_id].append(CreativePerformance(
+                creative_id=row.creative_id,
+                creative_name=row.creative_name,
+                persona_id=row.persona_id,
+                impressions=row.impressions,
+                clicks=row.clicks,
+                leads=row.leads,
+                conversions=row.conversions,
+                spend=row.spend,
+                ctr=row.ctr,
+                cvr=row.cvr,
+                cpl=row.cpl,
+                performance_score=row.score,
+                rank=row.rank
+            ))
+
+        return dict(rankings)
+
+    @staticmethod
+    def _creative_score_columns(impressions, clicks, spend, leads, conversions):
+        """
+        SQL counterpart of _calculate_creative_scores over aggregate columns.
+
+        Everything is computed in double precision so scores match the
+        NumPy version exactly.
+
+        Returns:
+            Tuple of (ctr, cvr, cpl, score) column expressions
+        """
+        ctr = case(
+            (impressions > 0, cast(clicks, Float) / impressions), else_=cast(0, Float)
+        )
+        cvr = case(
+            (leads > 0, cast(conversions, Float) / leads), else_=cast(0, Float)
+        )
+        cpl = case(
+            (leads > 0, cast(spend, Float) / leads), else_=cast(0, Float)
+        )
+
+        ctr_score = func.least(1.0, ctr / 0.03)
+        cvr_score = func.least(1.0, cvr / 0.08)
+        cpl_score = func.greatest(0.0, 1.0 - (cpl / 500))
+        volume_bonus = func.least(0.1, cast(impressions, Float) / 100000)
         
-        return rankings
+        score = (ctr_score * 0.25 + cvr_score * 0.45 + cpl_score * 0.30) + volume_bonus
+
+        return ctr, cvr, cpl, score
     
-    def _calculate_creative_score(
-        self,
-        ctr: float,
-        cvr: float,
-        cpl: float,
-        impressions: int
-    ) -> float:
-        """Calculate a composite performance score for a creative."""
+    @staticmethod
+    def _calculate_creative_scores(
+        impressions: np.ndarray,
+        clicks: np.ndarray,
+        spend: np.ndarray,
+        leads: np.ndarray,
+        conversions: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calculate composite performance scores for arrays of creatives.
+
+        Returns:
+            Tuple of (ctr, cvr, cpl, score) arrays
+        """
+        ctr = np.divide(clicks, impressions, out=np.zeros(len(impressions)), where=impressions > 0)
+        cvr = np.divide(conversions, leads, out=np.zeros(len(leads)), where=leads > 0)
+        cpl = np.divide(spend, leads, out=np.zeros(len(leads)), where=leads > 0)
+
         # Normalize metrics to 0-1 scale
-        ctr_score = min(1.0, ctr / 0.03)  # 3% CTR = perfect
-        cvr_score = min(1.0, cvr / 0.08)  # 8% CVR = perfect
-        cpl_score = max(0.0, 1.0 - (cpl / 500))  # $500 CPL = 0
+        ctr_score = np.minimum(1.0, ctr / 0.03)  # 3% CTR = perfect
+        cvr_score = np.minimum(1.0, cvr / 0.08)  # 8% CVR = perfect
+        cpl_score = np.maximum(0.0, 1.0 - (cpl / 500))  # $500 CPL = 0
         
         # Volume bonus (more data = more reliable)
-        volume_bonus = min(0.1, impressions / 100000)
+        volume_bonus = np.minimum(0.1, impressions / 100000)
         
         # Weighted score
-        score = (ctr_score * 0.25 + cvr_score * 0.45 + cpl_score * 0.30) + volume_bonus
+        scores = (ctr_score * 0.25 + cvr_score * 0.45 + cpl_score * 0.30) + volume_bonus
         
-        return score
+        return ctr, cvr, cpl, scores
     
     def _generate_persona_insights(
         self,
-        lookback_days: int
+        cutoff_date: date
     ) -> List[PersonaInsight]:
-        """Generate insights for each persona."""
-        cutoff_date = datetime.utcnow().date() - timedelta(days=lookback_days)
-        
+        """Generate insights for each persona from metrics since cutoff_date."""
+        # Campaign metrics for every active persona, split by platform. Personas
+        # without leads in the window get no insight, so nothing else is loaded
+        # for them.
+        platform_metrics = self._get_persona_platform_metrics(cutoff_date)
+        persona_ids = [
+            persona_id for persona_id, platforms in platform_metrics.items()
+            if any(m.leads for m in platforms.values())
+        ]
+
+        if not persona_ids:
+            return []
+
+        # Only the columns insights read; relationship access would be an N+1
         personas = self.db.execute(
-            select(Persona).where(Persona.status == PersonaStatus.ACTIVE)
+            select(Persona)
+            .options(
+                load_only(Persona.id, Persona.name, Persona.messaging, Persona.characteristics),
+                raiseload("*")
+            )
+            .where(Persona.id == any_(self._id_array('persona_ids', persona_ids)))
+            .order_by(Persona.id)
         ).scalars().all()
         
+        creative_metrics = self._get_persona_creative_metrics(persona_ids, cutoff_date)
+        best_creatives = self._find_best_creatives(creative_metrics)
+
         insights = []
         
         for persona in personas:
-            # Get campaigns for this persona
-            campaigns = self.db.execute(
-                select(Campaign).where(
-                    Campaign.strategy["persona_id"].astext.cast(int) == persona.id
-                )
-            ).scalars().all()
-            
-            if not campaigns:
-                continue
-            
-            campaign_ids = [c.id for c in campaigns]
-            
-            # Aggregate metrics
-            metrics = self.db.execute(
-                select(
-                    func.sum(MarketingMetric.impressions).label('impressions'),
-                    func.sum(MarketingMetric.clicks).label('clicks'),
-                    func.sum(MarketingMetric.spend).label('spend'),
-                    func.sum(MarketingMetric.leads).label('leads'),
-                    func.sum(MarketingMetric.qualified_leads).label('qualified_leads'),
-                    func.sum(MarketingMetric.closed_won).label('conversions')
-                ).where(
-                    MarketingMetric.campaign_id.in_(campaign_ids),
-                    MarketingMetric.date >= cutoff_date
-                )
-            ).first()
+            platforms = platform_metrics[persona.id]
+            leads = sum(m.leads or 0 for m in platforms.values())
             
-            if not metrics or not metrics.leads:
-                continue
-            
-            leads = metrics.leads or 0
-            qualified = metrics.qualified_leads or 0
-            conversions = metrics.conversions or 0
-            spend = float(metrics.spend or 0)
+            qualified = sum(m.qualified_leads or 0 for m in platforms.values())
+            conversions = sum(m.conversions or 0 for m in platforms.values())
+            spend = float(sum(m.spend or 0 for m in platforms.values()))
             
             qualified_rate = qualified / leads if leads > 0 else 0
             conversion_rate = conversions / leads if leads > 0 else 0
             avg_cpl = spend / leads if leads > 0 else 0
             
             # Find best platform
-            best_platform = self._find_best_platform(campaign_ids, cutoff_date)
+            best_platform = self._find_best_platform(platforms)
             
             # Find best creative
-            best_creative = self._find_best_creative(persona.id, cutoff_date)
+            best_creative = best_creatives.get(persona.id)
             
             # Analyze messaging effectiveness
             messaging_effectiveness = self._analyze_messaging_effectiveness(
-                persona, cutoff_date
+                persona, creative_metrics.get(persona.id, [])
             )
             
             # Generate recommendations
@@ -339,110 +449,150 @@ class LearningService:
         
         return insights
     
+    def _get_persona_platform_metrics(
+        self,
+        cutoff_date: date
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Campaign metric totals per (active persona, platform) in one grouped query.
+
+        Only the columns insights and platform selection read are summed.
+
+        Returns:
+            Dict of persona_id -> {platform value: row of summed metrics}
+        """
+        rows = self.db.execute(
+            select(
+                Campaign.strategy_persona_id.label('persona_id'),
+                Campaign.platform,
+                func.sum(MarketingMetric.spend).label('spend'),
+                func.sum(MarketingMetric.leads).label('leads'),
+                func.sum(MarketingMetric.qualified_leads).label('qualified_leads'),
+                func.sum(MarketingMetric.closed_won).label('conversions')
+            )
+            .join(MarketingMetric, MarketingMetric.campaign_id == Campaign.id)
+            .join(Persona, Persona.id == Campaign.strategy_persona_id)
+            .where(
+                Persona.status == PersonaStatus.ACTIVE,
+                MarketingMetric.date >= cutoff_date
+            )
+            .group_by(Campaign.strategy_persona_id, Campaign.platform)
+        ).all()
+
+        platform_metrics: Dict[int, Dict[str, Any]] = defaultdict(dict)
+        for row in rows:
+            platform_metrics[row.persona_id][row.platform.value] = row
+        return dict(platform_metrics)
+
+    def _get_persona_creative_metrics(
+        self,
+        persona_ids: List[int],
+        cutoff_date: date
+    ) -> Dict[int, List[Any]]:
+        """
+        Ad metric totals per creative in one grouped query.
+
+        Returns:
+            Dict of persona_id -> rows (creative id, name, copy and summed
+            metrics), in creative id order
+        """
+        rows = self.db.execute(
+            select(
+                Creative.persona_id,
+                Creative.id,
+                Creative.name,
+                Creative.headline,
+                Creative.primary_text,
+                func.sum(MarketingMetric.impressions).label('impressions'),
+                func.sum(MarketingMetric.clicks).label('clicks'),
+                func.sum(MarketingMetric.leads).label('leads'),
+                func.sum(MarketingMetric.spend).label('spend'),
+                func.sum(MarketingMetric.closed_won).label('conversions')
+            )
+            .join(Ad, Ad.creative_id == Creative.id)
+            .join(MarketingMetric, MarketingMetric.ad_id == Ad.id)
+            .where(
+                Creative.persona_id == any_(self._id_array('persona_ids', persona_ids)),
+                MarketingMetric.date >= cutoff_date
+            )
+            .group_by(Creative.id)
+            .order_by(Creative.id)
+        ).all()
+
+        creative_metrics: Dict[int, List[Any]] = defaultdict(list)
+        for row in rows:
+            creative_metrics[row.persona_id].append(row)
+        return dict(creative_metrics)
+
     def _find_best_platform(
         self,
-        campaign_ids: List[int],
-        cutoff_date
+        platform_metrics: Dict[str, Any]
     ) -> str:
-        """Find the best performing platform for campaigns."""
-        platform_performance = {}
-        
-        for platform in ["meta", "google", "tiktok"]:
-            # Get campaigns for this platform
-            platform_campaigns = self.db.execute(
-                select(Campaign.id).where(
-                    Campaign.id.in_(campaign_ids),
-                    Campaign.platform == CampaignPlatform(platform)
-                )
-            ).scalars().all()
-            
-            if not platform_campaigns:
-                continue
-            
-            # Get metrics
-            metrics = self.db.execute(
-                select(
-                    func.sum(MarketingMetric.leads).label('leads'),
-                    func.sum(MarketingMetric.closed_won).label('conversions')
-                ).where(
-                    MarketingMetric.campaign_id.in_(platform_campaigns),
-                    MarketingMetric.date >= cutoff_date
-                )
-            ).first()
-            
-            if metrics and metrics.leads:
-                cvr = (metrics.conversions or 0) / metrics.leads
-                platform_performance[platform] = cvr
-        
-        if not platform_performance:
-            return "meta"  # Default
+        """Find the best performing platform (by CVR) from per-platform metric totals."""
+        platform_cvr = {
+            platform: (platform_metrics[platform].conversions or 0) / platform_metrics[platform].leads
+            for platform in self.PLATFORMS
+            if platform in platform_metrics and platform_metrics[platform].leads
+        }
         
-        return max(platform_performance, key=platform_performance.get)
+        # Ties go to the earlier platform in PLATFORMS
+        return max(platform_cvr, key=platform_cvr.get) if platform_cvr else "meta"
     
-    def _find_best_creative(
+    def _find_best_creatives(
         self,
-        persona_id: int,
-        cutoff_date
-    ) -> Optional[Tuple[int, str]]:
-        """Find the best performing creative for a persona."""
-        creatives = self.db.execute(
-            select(Creative).where(Creative.persona_id == persona_id)
-        ).scalars().all()
-        
-        if not creatives:
-            return None
-        
-        best_creative = None
-        best_score = -1
-        
-        for creative in creatives:
-            # Get ads using this creative
-            ads = self.db.execute(
-                select(Ad.id).where(Ad.creative_id == creative.id)
-            ).scalars().all()
-            
-            if not ads:
-                continue
-            
-            # Get metrics
-            metrics = self.db.execute(
-                select(
-                    func.sum(MarketingMetric.impressions).label('impressions'),
-                    func.sum(MarketingMetric.clicks).label('clicks'),
-                    func.sum(MarketingMetric.leads).label('leads'),
-                    func.sum(MarketingMetric.spend).label('spend'),
-                    func.sum(MarketingMetric.closed_won).label('conversions')
-                ).where(
-                    MarketingMetric.ad_id.in_(ads),
-                    MarketingMetric.date >= cutoff_date
-                )
-            ).first()
-            
-            if not metrics or not metrics.impressions:
-                continue
-            
-            impressions = metrics.impressions or 0
-            clicks = metrics.clicks or 0
-            leads = metrics.leads or 0
-            spend = float(metrics.spend or 0)
-            conversions = metrics.conversions or 0
-            
-            ctr = clicks / impressions if impressions > 0 else 0
-            cvr = conversions / leads if leads > 0 else 0
-            cpl = spend / leads if leads > 0 else 0
-            
-            score = self._calculate_creative_score(ctr, cvr, cpl, impressions)
-            
-            if score > best_score:
-                best_score = score
-                best_creative = (creative.id, creative.name)
+        creative_metrics: Dict[int, List[Any]]
+    ) -> Dict[int, Tuple[int, str]]:
+        """
+        Find each persona's best performing creative from per-creative totals.
+
+        All creatives are scored in one vector and reduced with a single
+        group argmax, rather than scoring and reducing persona by persona.
+
+        Returns:
+            Dict of persona_id -> (creative_id, creative_name)
+        """
+        rows = [m for metrics in creative_metrics.values() for m in metrics if m.impressions]
+        if not rows:
+            return {}
         
-        return best_creative
+        *_, scores = self._calculate_creative_scores(
+            np.array([m.impressions for m in rows], dtype=np.int64),
+            np.array([m.clicks or 0 for m in rows], dtype=np.int64),
+            np.array([float(m.spend or 0) for m in rows], dtype=np.float64),
+            np.array([m.leads or 0 for m in rows], dtype=np.int64),
+            np.array([m.conversions or 0 for m in rows], dtype=np.int64)
+        )
+        persona_ids = np.array([m.persona_id for m in rows], dtype=np.int64)
+
+        best = {}
+        for persona_id, index in zip(*self._group_argmax(persona_ids, scores)):
+            row = rows[index]
+            best[persona_id] = (row.id, row.name)
+        return best
+
+    @staticmethod
+    def _group_argmax(
+        group_ids: np.ndarray,
+        scores: np.ndarray
+    ) -> Tuple[List[int], List[int]]:
+        """
+        Index of the highest score within each group, in one sort.
+
+        Ties go to the earliest index, as with np.argmax.
+
+        Returns:
+            Tuple of (group ids, index of each group's best score)
+        """
+        # lexsort is stable: by group, then descending score, then position
+        order = np.lexsort((-scores, group_ids))
+        sorted_groups = group_ids[order]
+        starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+        return sorted_groups[starts].tolist(), order[starts].tolist()
     
     def _analyze_messaging_effectiveness(
         self,
         persona: Persona,
-        cutoff_date
+        creative_metrics: List[Any]
     ) -> Dict[str, float]:
         """Analyze which messaging hooks are most effective."""
         messaging = persona.messaging or {}
@@ -451,49 +601,27 @@ class LearningService:
         if not hooks:
             return {}
         
-        # Get creatives for this persona
-        creatives = self.db.execute(
-            select(Creative).where(Creative.persona_id == persona.id)
-        ).scalars().all()
-        
-        hook_performance = {}
-        
-        for hook in hooks:
-            # Find creatives using this hook (simple text matching)
-            hook_lower = hook.lower()
-            matching_creatives = [
-                c for c in creatives
-                if hook_lower in (c.headline or "").lower() 
-                or hook_lower in (c.primary_text or "").lower()
-            ]
-            
-            if not matching_creatives:
-                continue
-            
-            creative_ids = [c.id for c in matching_creatives]
-            
-            # Get ads using these creatives
-            ads = self.db.execute(
-                select(Ad.id).where(Ad.creative_id.in_(creative_ids))
-            ).scalars().all()
-            
-            if not ads:
-                continue
-            
-            # Get metrics
-            metrics = self.db.execute(
-                select(
-                    func.sum(MarketingMetric.impressions).label('impressions'),
-                    func.sum(MarketingMetric.clicks).label('clicks')
-                ).where(
-                    MarketingMetric.ad_id.in_(ads),
-                    MarketingMetric.date >= cutoff_date
-                )
-            ).first()
-            
-            if metrics and metrics.impressions:
-                ctr = (metrics.clicks or 0) / metrics.impressions
-                hook_performance[hook] = ctr
+        # One pass over the creatives: each creative's copy is scanned once for
+        # all hooks together, and its totals credited to every hook it contains
+        hook_terms = {hook: hook.lower() for hook in hooks}
+        match_hooks = _hook_matcher(tuple(hook_terms.values()))
+        impressions = dict.fromkeys(hook_terms.values(), 0)
+        clicks = dict.fromkeys(hook_terms.values(), 0)
+
+        for creative in creative_metrics:
+            matched = (
+                match_hooks((creative.headline or "").lower())
+                | match_hooks((creative.primary_text or "").lower())
+            )
+            for term in matched:
+                impressions[term] += creative.impressions or 0
+                clicks[term] += creative.clicks or 0
+
+        hook_performance = {
+            hook: clicks[term] / impressions[term]
+            for hook, term in hook_terms.items()
+            if impressions[term]
+        }
         
         return hook_performance
     
@@ -562,10 +690,12 @@ class LearningService:
     def _apply_learnings(
         self,
         creative_rankings: Dict[int, List[CreativePerformance]],
-        insights: List[PersonaInsight]
+        insights: List[PersonaInsight],
+        now: datetime
     ) -> List[Dict[str, Any]]:
-        """Apply learnings automatically."""
+        """Apply learnings automatically, stamped with the cycle's clock reading."""
         actions = []
+        archive_ids = []
         
         # 1. Pause underperforming creatives
         for persona_id, rankings in creative_rankings.items():
@@ -577,12 +707,7 @@ class LearningService:
             
             for perf in underperformers:
                 if perf.leads >= self.MIN_LEADS_FOR_CONFIDENCE:
-                    # Pause the creative
-                    self.db.execute(
-                        update(Creative)
-                        .where(Creative.id == perf.creative_id)
-                        .values(status=CreativeStatus.ARCHIVED)
-                    )
+                    archive_ids.append(perf.creative_id)
                     
                     actions.append({
                         "type": "pause_creative",
@@ -590,26 +715,52 @@ class LearningService:
                         "reason": f"Underperforming (rank {perf.rank}/{len(rankings)}, CVR: {perf.cvr:.2%})"
                     })
         
+        # Pause them all in a single statement
+        if archive_ids:
+            self.db.execute(
+                update(Creative)
+                .where(Creative.id == any_(self._id_array('creative_ids', archive_ids)))
+                .values(status=CreativeStatus.ARCHIVED)
+                # Loaded creatives are expired by the commit below
+                .execution_options(synchronize_session=False)
+            )
+
         # 2. Update persona metrics
-        for insight in insights:
-            persona = self.db.get(Persona, insight.persona_id)
-            if persona:
-                current_metrics = persona.metrics or {}
+        if insights:
+            stored_metrics = dict(self.db.execute(
+                select(Persona.id, Persona.metrics)
+                .where(Persona.id == any_(self._id_array(
+                    'persona_ids', [insight.persona_id for insight in insights]
+                )))
+            ).all())
+
+            learned_at = now.isoformat()
+            persona_updates = []
+
+            for insight in insights:
+                if insight.persona_id not in stored_metrics:
+                    continue
+
+                current_metrics = dict(stored_metrics[insight.persona_id] or {})
                 current_metrics.update({
-                    "last_learning_cycle": datetime.utcnow().isoformat(),
+                    "last_learning_cycle": learned_at,
                     "total_leads": insight.total_leads,
                     "qualified_rate": insight.qualified_rate,
                     "conversion_rate": insight.conversion_rate,
                     "avg_cpl": insight.avg_cpl,
                     "best_platform": insight.best_platform
                 })
-                persona.metrics = current_metrics
+                persona_updates.append({"id": insight.persona_id, "metrics": current_metrics})
                 
                 actions.append({
                     "type": "update_persona_metrics",
                     "persona_id": insight.persona_id,
                     "metrics_updated": list(current_metrics.keys())
                 })
+
+            # Bulk UPDATE by primary key (executemany)
+            if persona_updates:
+                self.db.execute(update(Persona), persona_updates)
         
         self.db.commit()
         
@@ -617,72 +768,82 @@ class LearningService:
     
     def _calculate_improvements(
         self,
+        current_start: date,
         lookback_days: int
     ) -> Dict[str, float]:
         """Calculate improvement metrics compared to previous period."""
-        current_start = datetime.utcnow().date() - timedelta(days=lookback_days)
         previous_start = current_start - timedelta(days=lookback_days)
         
-        # Current period metrics
-        current_metrics = self.db.execute(
+        # Current and previous period totals from one scan over both periods;
+        # an ungrouped aggregate always returns exactly one row
+        in_current = MarketingMetric.date >= current_start
+        in_previous = MarketingMetric.date < current_start
+        (
+            current_spend, current_leads, current_conversions,
+            previous_spend, previous_leads, previous_conversions
+        ) = self.db.execute(
             select(
-                func.sum(MarketingMetric.spend).label('spend'),
-                func.sum(MarketingMetric.leads).label('leads'),
-                func.sum(MarketingMetric.closed_won).label('conversions')
-            ).where(MarketingMetric.date >= current_start)
-        ).first()
-        
-        # Previous period metrics
-        previous_metrics = self.db.execute(
-            select(
-                func.sum(MarketingMetric.spend).label('spend'),
-                func.sum(MarketingMetric.leads).label('leads'),
-                func.sum(MarketingMetric.closed_won).label('conversions')
-            ).where(
-                MarketingMetric.date >= previous_start,
-                MarketingMetric.date < current_start
-            )
-        ).first()
+                func.sum(case((in_current, MarketingMetric.spend))),
+                func.sum(case((in_current, MarketingMetric.leads))),
+                func.sum(case((in_current, MarketingMetric.closed_won))),
+                func.sum(case((in_previous, MarketingMetric.spend))),
+                func.sum(case((in_previous, MarketingMetric.leads))),
+                func.sum(case((in_previous, MarketingMetric.closed_won)))
+            ).where(MarketingMetric.date >= previous_start)
+        ).one()
         
         improvements = {}
         
-        if current_metrics and previous_metrics:
-            # CPL improvement
-            current_cpl = (float(current_metrics.spend or 0) / 
-                          (current_metrics.leads or 1))
-            previous_cpl = (float(previous_metrics.spend or 0) / 
-                           (previous_metrics.leads or 1))
-            if previous_cpl > 0:
-                improvements["cpl_change"] = (previous_cpl - current_cpl) / previous_cpl
-            
-            # CVR improvement
-            current_cvr = ((current_metrics.conversions or 0) / 
-                          (current_metrics.leads or 1))
-            previous_cvr = ((previous_metrics.conversions or 0) / 
-                           (previous_metrics.leads or 1))
-            if previous_cvr > 0:
-                improvements["cvr_change"] = (current_cvr - previous_cvr) / previous_cvr
-            
-            # Lead volume change
-            current_leads = current_metrics.leads or 0
-            previous_leads = previous_metrics.leads or 0
-            if previous_leads > 0:
-                improvements["lead_volume_change"] = (current_leads - previous_leads) / previous_leads
+        # CPL improvement
+        current_cpl = float(current_spend or 0) / (current_leads or 1)
+        previous_cpl = float(previous_spend or 0) / (previous_leads or 1)
+        if previous_cpl > 0:
+            improvements["cpl_change"] = (previous_cpl - current_cpl) / previous_cpl
+
+        # CVR improvement
+        current_cvr = (current_conversions or 0) / (current_leads or 1)
+        previous_cvr = (previous_conversions or 0) / (previous_leads or 1)
+        if previous_cvr > 0:
+            improvements["cvr_change"] = (current_cvr - previous_cvr) / previous_cvr
+
+        # Lead volume change
+        current_leads = current_leads or 0
+        previous_leads = previous_leads or 0
+        if previous_leads > 0:
+            improvements["lead_volume_change"] = (current_leads - previous_leads) / previous_leads
         
         return improvements
     
+    @staticmethod
+    def _id_array(name: str, ids: List[int]):
+        """
+        Bind a list of ids as one Postgres integer array, for `col == any_(...)`.
+
+        Unlike an expanded IN list, the SQL text does not change with the
+        number of ids, so the statement is cached and planned once.
+        """
+        return bindparam(name, value=list(ids), type_=ARRAY(Integer))
+
+    @staticmethod
+    def _metric_totals_query(*criteria):
+        """Ungrouped SUM(spend), SUM(leads), SUM(closed_won) over matching metrics."""
+        return select(
+            func.sum(MarketingMetric.spend),
+            func.sum(MarketingMetric.leads),
+            func.sum(MarketingMetric.closed_won)
+        ).where(*criteria)
+
     def get_learning_summary(
         self,
         days: int = 30
     ) -> Dict[str, Any]:
         """Get a summary of learning over a period."""
-        cutoff_date = datetime.utcnow().date() - timedelta(days=days)
+        cutoff_date = datetime.now(timezone.utc).date() - timedelta(days=days)
         
         # Count personas with data
         personas_with_campaigns = self.db.execute(
-            select(func.count(func.distinct(
-                Campaign.strategy["persona_id"].astext
-            ))).where(Campaign.status == CampaignStatus.ACTIVE)
+            select(func.count(func.distinct(Campaign.strategy_persona_id)))
+            .where(Campaign.status == CampaignStatus.ACTIVE)
         ).scalar()
         
         # Count active creatives
@@ -693,22 +854,18 @@ class LearningService:
         ).scalar()
         
         # Get overall metrics
-        metrics = self.db.execute(
-            select(
-                func.sum(MarketingMetric.spend).label('spend'),
-                func.sum(MarketingMetric.leads).label('leads'),
-                func.sum(MarketingMetric.closed_won).label('conversions')
-            ).where(MarketingMetric.date >= cutoff_date)
-        ).first()
+        spend, leads, conversions = self.db.execute(
+            self._metric_totals_query(MarketingMetric.date >= cutoff_date)
+        ).one()
+        spend = float(spend or 0)
         
         return {
             "period_days": days,
             "personas_with_campaigns": personas_with_campaigns or 0,
             "active_creatives": active_creatives or 0,
-            "total_spend": float(metrics.spend or 0) if metrics else 0,
-            "total_leads": metrics.leads or 0 if metrics else 0,
-            "total_conversions": metrics.conversions or 0 if metrics else 0,
-            "avg_cpl": (float(metrics.spend or 0) / (metrics.leads or 1)) if metrics else 0,
-            "avg_cvr": ((metrics.conversions or 0) / (metrics.leads or 1)) if metrics and metrics.leads else 0
+            "total_spend": spend,
+            "total_leads": leads or 0,
+            "total_conversions": conversions or 0,
+            "avg_cpl": spend / (leads or 1),
+            "avg_cvr": (conversions or 0) / leads if leads else 0
         }
-
@@ -4,22 +4,41 @@ Persona Discovery Service
 Discovers marketing personas through clustering analysis on lead profiles
 and behavioral data, with LLM-based labeling and characterization.
 """
-from typing import List, Dict, Any, Optional
+import asyncio
+import copy
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
 import numpy as np
 import pandas as pd
+from openai import AsyncOpenAI
+from scipy import sparse
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.decomposition import PCA
 from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import HDBSCAN, KMeans
-from sqlalchemy.orm import Session
 from sqlalchemy import select
-from openai import OpenAI
+from sqlalchemy.orm import Session
+
+try:
+    from hdbscan import HDBSCAN as FastHDBSCAN
+except ImportError:  # pragma: no cover - the reference library is optional at runtime
+    FastHDBSCAN = None
+    from sklearn.cluster import HDBSCAN
 
 from ...config import get_settings
 from ...logging import get_logger
-from ...models import Lead, LeadProfile, Qualification, Persona
+from ...models import Lead, LeadProfile, Persona, Qualification
+from ...models.lead import LeadPersona, LeadSource
 
 settings = get_settings()
 logger = get_logger(__name__)
 
+# LLM persona profiles by cluster-stats fingerprint, reused across discovery runs
+_PROFILE_CACHE: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
 
 class PersonaDiscoveryService:
     """
@@ -32,11 +51,31 @@ class PersonaDiscoveryService:
     4. Generate messaging and positioning
     """
     
+    # Cap on concurrent persona-labeling LLM requests
+    MAX_CONCURRENT_LLM_CALLS = 20
+
+    # Above this many leads K-Means switches to mini-batch updates
+    MINIBATCH_KMEANS_MIN_ROWS = 5000
+
+    # Wider feature matrices are projected down to this many dimensions before clustering
+    MAX_CLUSTERING_DIMENSIONS = 8
+
+    # Generated persona profiles are reused for clusters with matching stats
+    PROFILE_CACHE_SIZE = 512
+    PROFILE_CACHE_TTL = 86400 * 7  # 7 days
+
+    # Upper bound on a generated persona profile's length
+    PROFILE_MAX_TOKENS = 400
+
+    # Budget averages are binned to this step when fingerprinting clusters
+    PROFILE_BUDGET_BIN = 10000
+
     def __init__(self, db: Session):
         self.db = db
-        self.openai_client = OpenAI(api_key=settings.openai_api_key)
+        self.openai_client = AsyncOpenAI(api_key=settings.openai_api_key)
+        self.feature_projection: Optional[PCA] = None
     
-    def discover_personas(
+    async def discover_personas(
         self,
         min_cluster_size: int = 25,
         min_samples: int = 5,
@@ -56,80 +95,119 @@ class PersonaDiscoveryService:
         logger.info("persona_discovery_started", method=method)
         
         # 1. Fetch leads with profiles and qualifications
-        leads_data = self._fetch_leads_for_clustering()
+        df = self._fetch_leads_for_clustering()
         
-        if len(leads_data) < min_cluster_size * 2:
-            logger.warning("insufficient_data", lead_count=len(leads_data))
+        if len(df) < min_cluster_size * 2:
+            logger.warning("insufficient_data", lead_count=len(df))
             return []
         
         # 2. Feature extraction
-        df = pd.DataFrame(leads_data)
         features, feature_names = self._extract_features(df)
+        features = self._reduce_dimensions(features)
         
         # 3. Clustering
         if method == "hdbscan":
             clusters = self._cluster_hdbscan(features, min_cluster_size, min_samples)
         else:
-            n_clusters = max(3, len(leads_data) // 50)  # Auto-determine cluster count
+            n_clusters = max(3, len(df) // 50)  # Auto-determine cluster count
             clusters = self._cluster_kmeans(features, n_clusters)
         
-        # 4. Generate personas from clusters
-        personas = []
-        unique_clusters = np.unique(clusters[clusters >= 0])  # Exclude noise (-1)
+        # 4. Generate personas from clusters, grouping the leads in one pass
+        # Cluster sizes in one bincount; noise (-1) lands in slot 0 and is skipped
+        cluster_sizes = np.bincount(clusters.astype(np.intp) + 1)[1:]
+        valid_ids = np.flatnonzero(cluster_sizes >= min_cluster_size)
+        groups = df.groupby(clusters, sort=False)
+        summaries = pd.DataFrame(
+            self._cluster_means(
+                df[['budget_mid', 'beds', 'preapproved', 'score', '_urgency']].to_numpy(dtype=np.float64),
+                clusters
+            ),
+            columns=['avg_budget', 'avg_beds', 'preapproval_rate', 'avg_score', 'urgency_rate']
+        )
         
-        for cluster_id in unique_clusters:
-            cluster_mask = clusters == cluster_id
-            cluster_leads = df[cluster_mask]
-            
-            if len(cluster_leads) < min_cluster_size:
+        cluster_groups = [
+            (int(cluster_id), groups.get_group(cluster_id))
+            for cluster_id in valid_ids
+        ]
+
+        # Label every cluster concurrently - each LLM round-trip takes seconds
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_LLM_CALLS)
+        property_types = self._top_categories_by_cluster(df['property_type'], clusters)
+        cluster_stats = [
+            self._cluster_stats(cluster_leads, summaries.loc[cluster_id], property_types[cluster_id])
+            for cluster_id, cluster_leads in cluster_groups
+        ]
+        profiles = await asyncio.gather(*(
+            self._generate_persona_profile(cluster_id, stats, semaphore)
+            for (cluster_id, _), stats in zip(cluster_groups, cluster_stats)
+        ))
+
+        personas = []
+        for (cluster_id, cluster_leads), stats, profile in zip(cluster_groups, cluster_stats, profiles):
+            if profile is None:
                 continue
             
-            persona = self._generate_persona_from_cluster(
-                cluster_id=int(cluster_id),
-                cluster_data=cluster_leads,
-                feature_names=feature_names
-            )
-            
+            persona = self._build_persona(cluster_id, cluster_leads, stats, profile)
             if persona:
                 personas.append(persona)
         
-        logger.info("persona_discovery_completed", personas_found=len(personas))
+        # Save every persona in a single transaction
+        try:
+            self.db.add_all(personas)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error("persona_save_failed", persona_count=len(personas), error=str(e))
+            return []
+
+        # One summary line per run rather than one log event per persona
+        logger.info(
+            "persona_discovery_completed",
+            personas_found=len(personas),
+            personas=[
+                {"persona_id": p.id, "name": p.name, "sample_size": p.sample_size}
+                for p in personas
+            ]
+        )
         
         return personas
     
-    def _fetch_leads_for_clustering(self) -> List[Dict[str, Any]]:
-        """Fetch qualified leads with profiles and scores"""
+    def _fetch_leads_for_clustering(self) -> pd.DataFrame:
+        """Fetch qualified leads with profiles and scores, one row per lead"""
         stmt = (
-            select(Lead, LeadProfile, Qualification)
-            .join(LeadProfile, Lead.id == LeadProfile.lead_id, isouter=True)
-            .join(Qualification, Lead.id == Qualification.lead_id, isouter=True)
+            select(
+                Lead.id.label('lead_id'),
+                Lead.persona,
+                Lead.source,
+                LeadProfile.city,
+                LeadProfile.areas,
+                LeadProfile.property_type,
+                LeadProfile.beds,
+                LeadProfile.budget_min,
+                LeadProfile.budget_max,
+                LeadProfile.move_in_date,
+                LeadProfile.preapproved,
+                Qualification.score,
+                LeadProfile.preferences,
+            )
+            .join(LeadProfile, Lead.id == LeadProfile.lead_id)
+            .join(Qualification, Lead.id == Qualification.lead_id)
             .where(Qualification.qualified == True)
         )
         
-        results = self.db.execute(stmt).all()
-        
-        leads_data = []
-        for lead, profile, qualification in results:
-            if not profile:
-                continue
-            
-            leads_data.append({
-                "lead_id": lead.id,
-                "persona": lead.persona.value if lead.persona else "unknown",
-                "source": lead.source.value,
-                "city": profile.city,
-                "areas": profile.areas or [],
-                "property_type": profile.property_type,
-                "beds": profile.beds or 0,
-                "budget_min": float(profile.budget_min) if profile.budget_min else 0,
-                "budget_max": float(profile.budget_max) if profile.budget_max else 0,
-                "move_in_date": profile.move_in_date,
-                "preapproved": profile.preapproved or False,
-                "score": qualification.score if qualification else 50,
-                "preferences": profile.preferences or [],
-            })
+        df = pd.read_sql(stmt, self.db.connection())
         
-        return leads_data
+        df['persona'] = df['persona'].map({p: p.value for p in LeadPersona}).fillna("unknown")
+        df['source'] = df['source'].map({s: s.value for s in LeadSource})
+        df['property_type'] = df['property_type'].astype('category')
+        df['beds'] = df['beds'].fillna(0).astype(np.int16)
+        df[['budget_min', 'budget_max']] = df[['budget_min', 'budget_max']].astype(float).fillna(0)
+        df['preapproved'] = df['preapproved'].eq(True)
+        for column in ('areas', 'preferences'):
+            missing = df[column].isna()
+            df.loc[missing, column] = pd.Series([[]] * int(missing.sum()), index=df.index[missing], dtype=object)
+
+        return df
     
     def _extract_features(self, df: pd.DataFrame) -> tuple[np.ndarray, List[str]]:
         """
@@ -143,46 +221,75 @@ class PersonaDiscoveryService:
         - Pre-approval status
         - Qualification score
         """
-        features = []
-        feature_names = []
-        
-        # Budget features
-        budget_mid = ((df['budget_min'] + df['budget_max']) / 2).fillna(0)
-        budget_range = (df['budget_max'] - df['budget_min']).fillna(0)
-        features.append(budget_mid.values.reshape(-1, 1))
-        features.append(budget_range.values.reshape(-1, 1))
-        feature_names.extend(['budget_mid', 'budget_range'])
-        
-        # Property type one-hot
-        property_types = pd.get_dummies(df['property_type'], prefix='type')
-        features.append(property_types.values)
-        feature_names.extend(property_types.columns.tolist())
-        
-        # Bedrooms
-        features.append(df['beds'].fillna(0).values.reshape(-1, 1))
-        feature_names.append('beds')
-        
-        # Urgency (boolean)
-        urgency = df['move_in_date'].apply(
-            lambda x: 1 if x and 'immediately' in str(x).lower() else 0
+        # Budget features, kept on the frame for the cluster statistics
+        df['budget_mid'] = ((df['budget_min'] + df['budget_max']) / 2).fillna(0)
+        df['budget_range'] = (df['budget_max'] - df['budget_min']).fillna(0)
+
+        # Urgency (boolean), kept on the frame for the cluster statistics
+        df['_urgency'] = (
+            df['move_in_date'].astype('string').str.lower()
+            .str.contains('immediately', regex=False)
+            .fillna(False)
+            .to_numpy(dtype=np.uint8)
         )
-        features.append(urgency.values.reshape(-1, 1))
-        feature_names.append('urgency')
         
-        # Pre-approved
-        features.append(df['preapproved'].astype(int).values.reshape(-1, 1))
-        feature_names.append('preapproved')
+        # Numeric features written straight into one row-major float32 block;
+        # the narrow flag and bedroom columns are cast once on assignment
+        numeric_names = ['budget_mid', 'budget_range', 'beds', 'urgency', 'preapproved', 'score_normalized']
+        numeric = np.empty((len(df), len(numeric_names)), dtype=np.float32, order='C')
+        numeric[:, 0] = df['budget_mid'].to_numpy(dtype=np.float32)
+        numeric[:, 1] = df['budget_range'].to_numpy(dtype=np.float32)
+        numeric[:, 2] = df['beds'].to_numpy(copy=False)
+        numeric[:, 3] = df['_urgency'].to_numpy(copy=False)
+        numeric[:, 4] = df['preapproved'].to_numpy(dtype=np.uint8, copy=False)
+        numeric[:, 5] = df['score'].to_numpy(copy=False)
+        numeric[:, 5] /= 100  # Normalize
+
+        # Property type one-hot, kept sparse (missing types get no column)
+        type_codes = df['property_type'].cat.codes.to_numpy()
+        type_names = df['property_type'].cat.categories
+        has_type = type_codes >= 0
+        one_hot = sparse.csr_matrix(
+            (
+                np.ones(int(has_type.sum()), dtype=np.float32),
+                (np.flatnonzero(has_type), type_codes[has_type])
+            ),
+            shape=(len(df), len(type_names))
+        )
+        feature_names = numeric_names + [f'type_{category}' for category in type_names]
         
-        # Score
-        features.append((df['score'] / 100).values.reshape(-1, 1))  # Normalize
-        feature_names.append('score_normalized')
+        # Concatenate and normalize sparse; centering is skipped since it
+        # would densify the one-hot block and leaves Euclidean distances unchanged
+        X = sparse.hstack([numeric, one_hot], format='csr', dtype=np.float32)
+        X_scaled = StandardScaler(with_mean=False).fit_transform(X)
         
-        # Concatenate and normalize
-        X = np.concatenate(features, axis=1)
-        X_scaled = StandardScaler().fit_transform(X)
+        # Row-major float32 keeps the clustering distance scans cache-friendly
+        X_scaled = np.ascontiguousarray(X_scaled.toarray(), dtype=np.float32)
         
         return X_scaled, feature_names
     
+    def _reduce_dimensions(self, features: np.ndarray) -> np.ndarray:
+        """
+        Project wide feature matrices onto their top principal components.
+
+        Many property types make the one-hot block dominate the feature space,
+        which slows every distance computation and dilutes density estimates.
+        The fitted projection is kept on `feature_projection` for reuse.
+        """
+        if features.shape[1] <= self.MAX_CLUSTERING_DIMENSIONS:
+            self.feature_projection = None
+            return features
+
+        self.feature_projection = PCA(n_components=self.MAX_CLUSTERING_DIMENSIONS, random_state=42)
+        projected = self.feature_projection.fit_transform(features)
+
+        logger.info("features_projected",
+                   dimensions=features.shape[1],
+                   components=self.MAX_CLUSTERING_DIMENSIONS,
+                   explained_variance=float(self.feature_projection.explained_variance_ratio_.sum()))
+
+        return np.ascontiguousarray(projected, dtype=np.float32)
+
     def _cluster_hdbscan(
         self, 
         features: np.ndarray,
@@ -190,57 +297,170 @@ class PersonaDiscoveryService:
         min_samples: int
     ) -> np.ndarray:
         """Cluster using HDBSCAN (density-based)"""
-        clusterer = HDBSCAN(
-            min_cluster_size=min_cluster_size,
-            min_samples=min_samples,
-            metric='euclidean'
-        )
+        if FastHDBSCAN is not None:
+            clusterer = FastHDBSCAN(
+                min_cluster_size=min_cluster_size,
+                min_samples=min_samples,
+                metric='euclidean',
+                algorithm='boruvka_kdtree',
+                approx_min_span_tree=True,
+                core_dist_n_jobs=-1
+            )
+        else:
+            clusterer = HDBSCAN(
+                min_cluster_size=min_cluster_size,
+                min_samples=min_samples,
+                metric='euclidean'
+            )
         labels = clusterer.fit_predict(features)
         
         logger.info("hdbscan_clustering", 
-                   n_clusters=len(np.unique(labels[labels >= 0])),
-                   n_noise=np.sum(labels == -1))
+                   n_clusters=int(labels.max()) + 1,
+                   n_noise=int(np.count_nonzero(labels == -1)))
         
         return labels
     
     def _cluster_kmeans(self, features: np.ndarray, n_clusters: int) -> np.ndarray:
-        """Cluster using K-Means"""
-        clusterer = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+        """Cluster using K-Means (mini-batch for large lead sets)"""
+        if features.shape[0] > self.MINIBATCH_KMEANS_MIN_ROWS:
+            clusterer = MiniBatchKMeans(
+                n_clusters=n_clusters,
+                batch_size=1024,
+                n_init=3,
+                max_iter=100,
+                random_state=42
+            )
+        else:
+            clusterer = KMeans(n_clusters=n_clusters, random_state=42, n_init=1, algorithm='elkan')
         labels = clusterer.fit_predict(features)
         
         logger.info("kmeans_clustering", n_clusters=n_clusters)
         
         return labels
     
-    def _generate_persona_from_cluster(
+    @staticmethod
+    def _cluster_means(values: np.ndarray, labels: np.ndarray) -> np.ndarray:
+        """
+        Per-cluster column means of a (N, F) matrix in a single pass.
+
+        Noise rows (label -1) are skipped and NaNs are left out of each
+        column's mean, matching pandas' groupby mean.
+
+        Args:
+            values: Numeric values, one row per lead
+            labels: Cluster label per row
+
+        Returns:
+            (K, F) matrix of means, row k holding cluster k
+        """
+        keep = labels >= 0
+        labels, values = labels[keep], values[keep]
+        n_clusters = int(labels.max()) + 1 if len(labels) else 0
+
+        valid = ~np.isnan(values)
+        sums = np.zeros((n_clusters, values.shape[1]))
+        counts = np.zeros((n_clusters, values.shape[1]))
+        np.add.at(sums, labels, np.where(valid, values, 0.0))
+        np.add.at(counts, labels, valid)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return sums / counts
+
+    @staticmethod
+    def _top_categories_by_cluster(
+        categories: pd.Series,
+        labels: np.ndarray,
+        top_n: int = 3
+    ) -> Dict[int, Dict[str, int]]:
+        """
+        Most frequent categories of every cluster from one bincount over category codes.
+
+        Ties keep the order in which the categories first appear in the cluster.
+
+        Args:
+            categories: Categorical column, one row per lead
+            labels: Cluster label per row (-1 for noise)
+            top_n: Number of categories to keep per cluster
+
+        Returns:
+            Mapping of cluster id to {category: count}, most frequent first
+        """
+        codes = categories.cat.codes.to_numpy()
+        names = categories.cat.categories
+        n_types = len(names)
+        n_clusters = int(labels.max()) + 1 if len(labels) else 0
+
+        rows = np.flatnonzero((labels >= 0) & (codes >= 0))
+        cells = labels[rows] * n_types + codes[rows]
+        counts = np.bincount(cells, minlength=n_clusters * n_types).reshape(n_clusters, n_types)
+        first_seen = np.full(n_clusters * n_types, len(labels))
+        np.minimum.at(first_seen, cells, rows)
+        first_seen = first_seen.reshape(n_clusters, n_types)
+
+        top_categories = {}
+        for cluster_id in range(n_clusters):
+            order = np.lexsort((first_seen[cluster_id], -counts[cluster_id]))[:top_n]
+            top_categories[cluster_id] = {
+                names[i]: int(counts[cluster_id, i]) for i in order if counts[cluster_id, i]
+            }
+
+        return top_categories
+
+    def _cluster_stats(
         self,
-        cluster_id: int,
         cluster_data: pd.DataFrame,
-        feature_names: List[str]
-    ) -> Optional[Persona]:
+        summary: pd.Series,
+        property_types: Dict[str, int]
+    ) -> Dict[str, Any]:
         """
-        Use LLM to generate persona name, description, and messaging.
+        Calculate the cluster statistics the persona is generated from.
+
+        Args:
+            cluster_data: The cluster's leads
+            summary: The cluster's row of the grouped numeric aggregates
+            property_types: The cluster's most common property types with counts
         """
-        # Calculate cluster statistics
-        stats = {
+        return {
             "size": len(cluster_data),
-            "avg_budget": float(cluster_data['budget_mid'].mean()) if 'budget_mid' in cluster_data else 0,
-            "common_property_types": cluster_data['property_type'].value_counts().head(3).to_dict(),
+            "avg_budget": float(summary['avg_budget']),
+            "common_property_types": property_types,
             "common_areas": self._most_common_items(cluster_data['areas']),
-            "avg_beds": float(cluster_data['beds'].mean()),
-            "preapproval_rate": float(cluster_data['preapproved'].mean()),
-            "avg_score": float(cluster_data['score'].mean()),
-            "urgency_rate": float((cluster_data['move_in_date'].str.contains('immediately', case=False, na=False)).mean()),
+            "avg_beds": float(summary['avg_beds']),
+            "preapproval_rate": float(summary['preapproval_rate']),
+            "avg_score": float(summary['avg_score']),
+            "urgency_rate": float(summary['urgency_rate']),
         }
+
+    async def _generate_persona_profile(
+        self,
+        cluster_id: int,
+        stats: Dict[str, Any],
+        semaphore: asyncio.Semaphore
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Use LLM to generate persona name, description, and messaging.
+
+        Profiles are cached by a fingerprint of the rounded statistics, so
+        clusters that reappear unchanged across runs skip the LLM call.
+
+        Returns:
+            Parsed persona profile, or None if generation failed
+        """
+        key = self._stats_fingerprint(stats)
+        cached = _PROFILE_CACHE.get(key)
+        if cached and time.time() < cached[0]:
+            _PROFILE_CACHE.move_to_end(key)
+            logger.debug("persona_profile_cache_hit", cluster_id=cluster_id)
+            return copy.deepcopy(cached[1])
         
-        # Generate persona via LLM
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are a marketing strategist specializing in real estate.
+            async with semaphore:
+                response = await self.openai_client.chat.completions.create(
+                    model=settings.openai_persona_model,
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": """You are a marketing strategist specializing in real estate.
 Generate a persona profile from lead cluster statistics. Return JSON with:
 {
   "name": "Descriptive persona name",
@@ -249,19 +469,52 @@ Generate a persona profile from lead cluster statistics. Return JSON with:
   "objections": {"objection": "rebuttal"},
   "tone": "recommended tone"
 }"""
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Cluster statistics:\n{stats}\n\nGenerate persona profile."
-                    }
-                ],
-                temperature=0.7,
-                response_format={"type": "json_object"}
-            )
+                        },
+                        {
+                            "role": "user",
+                            "content": f"Cluster statistics:\n{stats}\n\nGenerate persona profile."
+                        }
+                    ],
+                    temperature=0.7,
+                    max_tokens=self.PROFILE_MAX_TOKENS,
+                    response_format={"type": "json_object"}
+                )
             
-            import json
-            persona_profile = json.loads(response.choices[0].message.content)
+            profile = json.loads(response.choices[0].message.content)
             
+        except Exception as e:
+            logger.error("persona_generation_failed", cluster_id=cluster_id, error=str(e))
+            return None
+
+        _PROFILE_CACHE[key] = (time.time() + self.PROFILE_CACHE_TTL, copy.deepcopy(profile))
+        _PROFILE_CACHE.move_to_end(key)
+        while len(_PROFILE_CACHE) > self.PROFILE_CACHE_SIZE:
+            _PROFILE_CACHE.popitem(last=False)
+
+        return profile
+
+    @classmethod
+    def _stats_fingerprint(cls, stats: Dict[str, Any]) -> str:
+        """Hash cluster statistics, rounded so near-identical clusters collide"""
+        rounded = {
+            key: value if not isinstance(value, float)
+            else round(value / cls.PROFILE_BUDGET_BIN) * cls.PROFILE_BUDGET_BIN if key == "avg_budget"
+            else round(value, 2)
+            for key, value in stats.items()
+        }
+        payload = json.dumps(rounded, sort_keys=True, default=str).encode()
+
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    def _build_persona(
+        self,
+        cluster_id: int,
+        cluster_data: pd.DataFrame,
+        stats: Dict[str, Any],
+        persona_profile: Dict[str, Any]
+    ) -> Optional[Persona]:
+        """Create an unsaved Persona from cluster statistics and its LLM profile."""
+        try:
             # Create Persona object
             persona = Persona(
                 name=persona_profile.get("name", f"Persona {cluster_id}"),
@@ -294,14 +547,6 @@ Generate a persona profile from lead cluster statistics. Return JSON with:
                 confidence_score=min(100, stats["size"] / 10)  # Confidence based on sample size
             )
             
-            self.db.add(persona)
-            self.db.commit()
-            
-            logger.info("persona_generated", 
-                       persona_id=persona.id,
-                       name=persona.name,
-                       sample_size=stats["size"])
-            
             return persona
             
         except Exception as e:
@@ -309,14 +554,7 @@ Generate a persona profile from lead cluster statistics. Return JSON with:
             return None
     
     @staticmethod
-    def _most_common_items(series_of_lists, top_n: int = 5) -> List[str]:
-        """Get most common items from a series of lists"""
-        all_items = []
-        for items in series_of_lists:
-            if items:
-                all_items.extend(items)
-        
-        from collections import Counter
-        counts = Counter(all_items)
-        return [item for item, _ in counts.most_common(top_n)]
-
+    def _most_common_items(series_of_lists: pd.Series, top_n: int = 5) -> List[str]:
+        """Get most common items from a series of lists (ties keep first-seen order)"""
+        counts = series_of_lists.explode().dropna().value_counts(sort=False)
+        return counts.sort_values(ascending=False, kind='stable').head(top_n).index.tolist()
@@ -6,16 +6,18 @@ historical performance, persona characteristics, and platform-specific strengths
 """
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from heapq import nlargest
+from operator import attrgetter
+from datetime import date, datetime, timedelta
 import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy import select, func, and_
 
 from ...config import get_settings
 from ...logging import get_logger
 from ...models import (
     Persona, Campaign, AdSet, MarketingMetric,
-    CampaignPlatform, CampaignStatus
+    CampaignStatus
 )
 
 settings = get_settings()
@@ -58,14 +60,17 @@ class PlatformSelectorService:
     for exploration/exploitation balance.
     """
     
-    # Platform characteristics and strengths
+    # Platform characteristics and strengths; strengths and best_for are sets
+    # for the persona-fit membership checks, strengths_ordered keeps the
+    # declared order for rationales
     PLATFORM_PROFILES = {
         "meta": {
             "display_name": "Meta (Facebook/Instagram)",
-            "strengths": ["visual_content", "retargeting", "lookalike", "broad_reach"],
+            "strengths": frozenset({"visual_content", "retargeting", "lookalike", "broad_reach"}),
+            "strengths_ordered": ("visual_content", "retargeting", "lookalike", "broad_reach"),
             "demographics": {"age_min": 25, "age_max": 55, "skews": ["female"]},
             "min_daily_budget": 10.0,
-            "best_for": ["luxury", "lifestyle", "investment", "first_time_buyer"],
+            "best_for": frozenset({"luxury", "lifestyle", "investment", "first_time_buyer"}),
             "objective_fit": {
                 "lead_generation": 0.9,
                 "brand_awareness": 0.85,
@@ -75,10 +80,11 @@ class PlatformSelectorService:
         },
         "google": {
             "display_name": "Google Ads",
-            "strengths": ["intent_based", "search", "high_intent", "broad_reach"],
+            "strengths": frozenset({"intent_based", "search", "high_intent", "broad_reach"}),
+            "strengths_ordered": ("intent_based", "search", "high_intent", "broad_reach"),
             "demographics": {"age_min": 25, "age_max": 65, "skews": []},
             "min_daily_budget": 20.0,
-            "best_for": ["investor", "luxury", "commercial", "high_budget"],
+            "best_for": frozenset({"investor", "luxury", "commercial", "high_budget"}),
             "objective_fit": {
                 "lead_generation": 0.85,
                 "conversions": 0.95,
@@ -88,10 +94,11 @@ class PlatformSelectorService:
         },
         "tiktok": {
             "display_name": "TikTok Ads",
-            "strengths": ["video_content", "viral", "young_audience", "engagement"],
+            "strengths": frozenset({"video_content", "viral", "young_audience", "engagement"}),
+            "strengths_ordered": ("video_content", "viral", "young_audience", "engagement"),
             "demographics": {"age_min": 18, "age_max": 40, "skews": ["young"]},
             "min_daily_budget": 20.0,
-            "best_for": ["first_time_buyer", "renter", "young_professional"],
+            "best_for": frozenset({"first_time_buyer", "renter", "young_professional"}),
             "objective_fit": {
                 "brand_awareness": 0.9,
                 "traffic": 0.8,
@@ -101,8 +108,27 @@ class PlatformSelectorService:
         }
     }
     
-    def __init__(self, db: Session):
+    # Platform score components and their weights, in matching order
+    SCORE_COMPONENTS = ("historical", "persona_fit", "objective", "budget")
+    SCORE_WEIGHTS = np.array([0.40, 0.25, 0.20, 0.15])
+
+    # Weights used when historical confidence is below LOW_CONFIDENCE_THRESHOLD
+    LOW_CONFIDENCE_THRESHOLD = 0.3
+    LOW_CONFIDENCE_WEIGHTS = np.array([0.20, 0.35, 0.30, 0.15])
+
+    # No historical data - neutral score with low confidence
+    NO_HISTORY: Tuple[float, Dict[str, float], float] = (0.5, {}, 0.1)
+
+    def __init__(self, db: Session, rng: Optional[np.random.Generator] = None):
         self.db = db
+        # Per-service generator for Thompson sampling; pass a seeded one for
+        # deterministic allocations
+        self._rng = rng if rng is not None else np.random.default_rng()
+        # Reference date for lookback windows, fixed for the service's lifetime
+        self._today: date = datetime.utcnow().date()
+        # Historical performance per (persona_id, lookback_days, cutoff_date),
+        # scoped to this service's session
+        self._historical_cache: Dict[Tuple[int, int, date], Dict[str, Tuple[float, Dict[str, float], float]]] = {}
     
     def select_platforms_for_persona(
         self,
@@ -110,7 +136,8 @@ class PlatformSelectorService:
         total_budget: float,
         objective: str = "lead_generation",
         lookback_days: int = 30,
-        max_platforms: int = 3
+        max_platforms: int = 3,
+        generate_rationale: bool = True
     ) -> PlatformRecommendation:
         """
         Select and rank platforms for a persona.
@@ -121,6 +148,8 @@ class PlatformSelectorService:
             objective: Campaign objective
             lookback_days: Days of historical data to use
             max_platforms: Maximum platforms to recommend
+            generate_rationale: Build per-platform rationale text; callers
+                that only read scores can skip it
         
         Returns:
             PlatformRecommendation with ranked platforms and budget allocation
@@ -132,29 +161,107 @@ class PlatformSelectorService:
         if not persona:
             raise ValueError(f"Persona {persona_id} not found")
         
-        # Calculate scores for each platform
+        return self._recommend_platforms(
+            persona, total_budget, objective, lookback_days, max_platforms, generate_rationale
+        )
+
+    def select_platforms_for_personas(
+        self,
+        persona_ids: List[int],
+        total_budget: float,
+        objective: str = "lead_generation",
+        lookback_days: int = 30,
+        max_platforms: int = 3,
+        generate_rationale: bool = True
+    ) -> List[PlatformRecommendation]:
+        """
+        Select and rank platforms for several personas.
+
+        Personas and their historical performance are loaded with one query
+        each up front, rather than per persona.
+
+        Args:
+            persona_ids: Target personas
+            total_budget: Total daily budget available to each persona
+            objective: Campaign objective
+            lookback_days: Days of historical data to use
+            max_platforms: Maximum platforms to recommend per persona
+            generate_rationale: Build per-platform rationale text
+
+        Returns:
+            PlatformRecommendation per persona, in persona_ids order
+        """
+        logger.info("platform_selection_batch_started", persona_count=len(persona_ids))
+
+        personas = {
+            persona.id: persona
+            for persona in self.db.execute(
+                select(Persona).where(Persona.id.in_(persona_ids))
+            ).scalars()
+        }
+        for persona_id in persona_ids:
+            if persona_id not in personas:
+                raise ValueError(f"Persona {persona_id} not found")
+
+        # Warm the historical cache for every persona in one aggregate query
+        self._get_historical_performances(list(personas), lookback_days)
+
+        return [
+            self._recommend_platforms(
+                personas[persona_id], total_budget, objective, lookback_days, max_platforms, generate_rationale
+            )
+            for persona_id in persona_ids
+        ]
+
+    def _recommend_platforms(
+        self,
+        persona: Persona,
+        total_budget: float,
+        objective: str,
+        lookback_days: int,
+        max_platforms: int,
+        generate_rationale: bool
+    ) -> PlatformRecommendation:
+        """Score, sample and pick platforms for a loaded persona."""
+        persona_id = persona.id
+
+        # Historical performance for every platform in one aggregate query
+        historical = self._get_historical_performance(persona.id, lookback_days)
+
+        # Calculate scores for each platform the budget can sustain
         platform_scores = []
-        for platform_key in self.PLATFORM_PROFILES.keys():
+        for platform_key, profile in self.PLATFORM_PROFILES.items():
+            if total_budget < profile["min_daily_budget"]:
+                continue
             score = self._calculate_platform_score(
                 persona=persona,
                 platform=platform_key,
                 objective=objective,
-                lookback_days=lookback_days,
-                total_budget=total_budget
+                total_budget=total_budget,
+                historical=historical.get(platform_key, self.NO_HISTORY),
+                generate_rationale=generate_rationale
             )
             platform_scores.append(score)
         
-        # Sort by score
-        platform_scores.sort(key=lambda x: x.score, reverse=True)
-        
-        # Filter platforms that meet minimum budget
-        viable_platforms = [
-            p for p in platform_scores
-            if total_budget * p.recommended_budget_pct >= self.PLATFORM_PROFILES[p.platform]["min_daily_budget"]
-        ]
-        
-        # Limit to max_platforms
-        selected_platforms = viable_platforms[:max_platforms]
+        # Thompson-sample every platform's budget share in one draw
+        budget_pcts = self._calculate_budget_allocations(
+            scores=np.array([p.score for p in platform_scores]) / 100,
+            confidences=np.array([p.confidence for p in platform_scores]),
+            min_budgets=np.array([self.PLATFORM_PROFILES[p.platform]["min_daily_budget"] for p in platform_scores]),
+            total_budget=total_budget
+        )
+        for platform_score, budget_pct in zip(platform_scores, budget_pcts):
+            platform_score.recommended_budget_pct = float(budget_pct)
+
+        # Top max_platforms by score among platforms that meet minimum budget
+        selected_platforms = nlargest(
+            max_platforms,
+            (
+                p for p in platform_scores
+                if total_budget * p.recommended_budget_pct >= self.PLATFORM_PROFILES[p.platform]["min_daily_budget"]
+            ),
+            key=attrgetter("score")
+        )
         
         # Rebalance budget allocation
         if selected_platforms:
@@ -183,8 +290,9 @@ class PlatformSelectorService:
         persona: Persona,
         platform: str,
         objective: str,
-        lookback_days: int,
-        total_budget: float
+        total_budget: float,
+        historical: Tuple[float, Dict[str, float], float],
+        generate_rationale: bool = True
     ) -> PlatformScore:
         """Calculate platform score for a persona."""
         profile = self.PLATFORM_PROFILES[platform]
@@ -193,9 +301,7 @@ class PlatformSelectorService:
         scores = {}
         
         # 1. Historical performance (40% weight)
-        perf_score, perf_metrics, perf_confidence = self._get_historical_performance(
-            persona.id, platform, lookback_days
-        )
+        perf_score, perf_metrics, perf_confidence = historical
         scores["historical"] = perf_score
         
         # 2. Persona fit (25% weight)
@@ -212,41 +318,20 @@ class PlatformSelectorService:
         )
         scores["budget"] = budget_score
         
-        # Weighted average
-        weights = {
-            "historical": 0.40,
-            "persona_fit": 0.25,
-            "objective": 0.20,
-            "budget": 0.15
-        }
-        
-        # Adjust weights if low confidence on historical data
-        if perf_confidence < 0.3:
-            weights["historical"] = 0.20
-            weights["persona_fit"] = 0.35
-            weights["objective"] = 0.30
-            weights["budget"] = 0.15
-        
-        final_score = sum(scores[k] * weights[k] for k in scores) * 100
-        
-        # Calculate recommended budget percentage using Thompson Sampling
-        budget_pct = self._calculate_budget_allocation(
-            score=final_score / 100,
-            confidence=perf_confidence,
-            min_budget=profile["min_daily_budget"],
-            total_budget=total_budget
-        )
+        # Weighted average, leaning away from history when it is thin
+        component_scores = np.array([scores[k] for k in self.SCORE_COMPONENTS])
+        final_score = float(self._weighted_scores(component_scores, perf_confidence))
         
         # Generate rationale
         rationale = self._generate_rationale(
             platform, profile, scores, perf_metrics, persona
-        )
+        ) if generate_rationale else ""
         
         return PlatformScore(
             platform=platform,
             score=final_score,
             confidence=perf_confidence,
-            recommended_budget_pct=budget_pct,
+            recommended_budget_pct=0.0,  # Sampled for all platforms together
             rationale=rationale,
             metrics=perf_metrics
         )
@@ -254,44 +339,77 @@ class PlatformSelectorService:
     def _get_historical_performance(
         self,
         persona_id: int,
-        platform: str,
         lookback_days: int
-    ) -> Tuple[float, Dict[str, float], float]:
-        """Get historical performance for persona on platform."""
-        cutoff_date = datetime.utcnow().date() - timedelta(days=lookback_days)
-        
-        # Find campaigns for this persona on this platform
-        campaigns = self.db.execute(
-            select(Campaign).where(
-                Campaign.platform == CampaignPlatform(platform),
-                Campaign.strategy["persona_id"].astext.cast(int) == persona_id
-            )
-        ).scalars().all()
-        
-        if not campaigns:
-            # No historical data - return neutral score with low confidence
-            return 0.5, {}, 0.1
-        
-        campaign_ids = [c.id for c in campaigns]
-        
-        # Aggregate metrics
-        metrics = self.db.execute(
-            select(
-                func.sum(MarketingMetric.impressions).label('impressions'),
-                func.sum(MarketingMetric.clicks).label('clicks'),
-                func.sum(MarketingMetric.spend).label('spend'),
-                func.sum(MarketingMetric.leads).label('leads'),
-                func.sum(MarketingMetric.qualified_leads).label('qualified_leads'),
-                func.sum(MarketingMetric.closed_won).label('conversions')
-            ).where(
-                MarketingMetric.campaign_id.in_(campaign_ids),
-                MarketingMetric.date >= cutoff_date
-            )
-        ).first()
-        
-        if not metrics or not metrics.impressions:
-            return 0.5, {}, 0.1
+    ) -> Dict[str, Tuple[float, Dict[str, float], float]]:
+        """
+        Get historical performance for persona on every platform.
+
+        Returns:
+            Dict with platform -> (performance score, metrics, confidence);
+            platforms without data are left out
+        """
+        return self._get_historical_performances([persona_id], lookback_days)[persona_id]
+
+    def _get_historical_performances(
+        self,
+        persona_ids: List[int],
+        lookback_days: int
+    ) -> Dict[int, Dict[str, Tuple[float, Dict[str, float], float]]]:
+        """
+        Get historical performance for several personas on every platform.
+
+        Personas not already cached are aggregated together in one query.
+
+        Returns:
+            Dict with persona_id -> platform -> (performance score, metrics,
+            confidence); platforms without data are left out
+        """
+        cutoff_date = self._today - timedelta(days=lookback_days)
         
+        uncached = [
+            persona_id for persona_id in dict.fromkeys(persona_ids)
+            if (persona_id, lookback_days, cutoff_date) not in self._historical_cache
+        ]
+        if uncached:
+            # Aggregate the personas' campaign metrics per platform in one pass;
+            # campaigns come from idx_campaigns_persona_platform (strategy_persona_id,
+            # platform) and their metrics from idx_metrics_campaign_date
+            rows = self.db.execute(
+                select(
+                    Campaign.strategy_persona_id.label('persona_id'),
+                    Campaign.platform,
+                    func.sum(MarketingMetric.impressions).label('impressions'),
+                    func.sum(MarketingMetric.clicks).label('clicks'),
+                    func.sum(MarketingMetric.spend).label('spend'),
+                    func.sum(MarketingMetric.leads).label('leads'),
+                    func.sum(MarketingMetric.qualified_leads).label('qualified_leads'),
+                    func.sum(MarketingMetric.closed_won).label('conversions')
+                )
+                .join(MarketingMetric, MarketingMetric.campaign_id == Campaign.id)
+                .where(
+                    Campaign.strategy_persona_id.in_(uncached),
+                    MarketingMetric.date >= cutoff_date
+                )
+                .group_by(Campaign.strategy_persona_id, Campaign.platform)
+            ).all()
+
+            historical: Dict[int, Dict[str, Tuple[float, Dict[str, float], float]]] = {
+                persona_id: {} for persona_id in uncached
+            }
+            for row in rows:
+                if row.impressions:
+                    historical[row.persona_id][row.platform.value] = self._score_historical_metrics(row)
+            for persona_id, platforms in historical.items():
+                self._historical_cache[(persona_id, lookback_days, cutoff_date)] = platforms
+
+        return {
+            persona_id: self._historical_cache[(persona_id, lookback_days, cutoff_date)]
+            for persona_id in persona_ids
+        }
+
+    @staticmethod
+    def _score_historical_metrics(metrics: Any) -> Tuple[float, Dict[str, float], float]:
+        """Turn aggregated platform metrics into a performance score and confidence."""
         # Calculate performance metrics
         impressions = metrics.impressions or 0
         clicks = metrics.clicks or 0
@@ -324,6 +442,22 @@ class PlatformSelectorService:
         
         return perf_score, perf_metrics, confidence
     
+    @classmethod
+    def _weighted_scores(cls, component_scores: np.ndarray, confidences: Any) -> np.ndarray:
+        """
+        Weighted platform scores (0-100) for one or many rows of component scores.
+
+        The weight set is selected per row without branching, so a (N, 4)
+        matrix with N confidences is scored in one pass.
+
+        Args:
+            component_scores: Scores in SCORE_COMPONENTS order, shape (4,) or (N, 4)
+            confidences: Historical confidence, scalar or shape (N,)
+        """
+        high_confidence = (np.asarray(confidences) >= cls.LOW_CONFIDENCE_THRESHOLD)[..., None]
+        weights = np.where(high_confidence, cls.SCORE_WEIGHTS, cls.LOW_CONFIDENCE_WEIGHTS)
+        return (component_scores * weights).sum(axis=-1) * 100
+
     def _calculate_persona_fit(self, persona: Persona, profile: Dict) -> float:
         """Calculate how well persona matches platform profile."""
         fit_scores = []
@@ -337,12 +471,12 @@ class PlatformSelectorService:
         avg_budget = sum(budget_range) / 2 if budget_range else 500000
         
         if avg_budget > 1500000:  # Luxury
-            if "luxury" in profile.get("best_for", []):
+            if "luxury" in profile.get("best_for", ()):
                 fit_scores.append(1.0)
             else:
                 fit_scores.append(0.5)
         elif avg_budget < 500000:  # First-time/value
-            if "first_time_buyer" in profile.get("best_for", []):
+            if "first_time_buyer" in profile.get("best_for", ()):
                 fit_scores.append(1.0)
             else:
                 fit_scores.append(0.6)
@@ -353,9 +487,9 @@ class PlatformSelectorService:
         urgency = characteristics.get("urgency", "medium")
         if urgency == "high":
             # High intent -> Google Search
-            if "intent_based" in profile.get("strengths", []):
+            if "intent_based" in profile.get("strengths", ()):
                 fit_scores.append(1.0)
-            elif "visual_content" in profile.get("strengths", []):
+            elif "visual_content" in profile.get("strengths", ()):
                 fit_scores.append(0.7)
             else:
                 fit_scores.append(0.6)
@@ -365,7 +499,7 @@ class PlatformSelectorService:
         # Decision speed
         decision_speed = characteristics.get("decision_speed", "moderate")
         if decision_speed == "fast":
-            if "intent_based" in profile.get("strengths", []):
+            if "intent_based" in profile.get("strengths", ()):
                 fit_scores.append(0.9)
             else:
                 fit_scores.append(0.7)
@@ -388,27 +522,25 @@ class PlatformSelectorService:
         headroom = (total_budget - min_budget) / min_budget
         return min(1.0, 0.5 + (headroom * 0.1))
     
-    def _calculate_budget_allocation(
+    def _calculate_budget_allocations(
         self,
-        score: float,
-        confidence: float,
-        min_budget: float,
+        scores: np.ndarray,
+        confidences: np.ndarray,
+        min_budgets: np.ndarray,
         total_budget: float
-    ) -> float:
-        """Calculate recommended budget percentage using Thompson Sampling."""
-        # Sample from Beta distribution based on score and confidence
-        alpha = score * confidence * 10 + 1
-        beta = (1 - score) * confidence * 10 + 1
+    ) -> np.ndarray:
+        """Calculate recommended budget percentages for all platforms using Thompson Sampling."""
+        # Sample from Beta distributions based on score and confidence
+        alpha = scores * confidences * 10 + 1
+        beta = (1 - scores) * confidences * 10 + 1
         
-        sampled_score = np.random.beta(alpha, beta)
+        sampled_scores = self._rng.beta(alpha, beta)
         
         # Ensure minimum viable budget
-        min_pct = min_budget / total_budget if total_budget > 0 else 0
+        min_pcts = min_budgets / total_budget if total_budget > 0 else np.zeros_like(min_budgets)
         
-        # Scale sampled score to budget percentage
-        budget_pct = max(min_pct, sampled_score * 0.6)  # Max 60% per platform
-        
-        return budget_pct
+        # Scale sampled scores to budget percentages
+        return np.maximum(min_pcts, sampled_scores * 0.6)  # Max 60% per platform
     
     def _rebalance_budget(
         self,
@@ -477,7 +609,7 @@ class PlatformSelectorService:
             parts.append(f"Good fit for {persona.name}")
         
         # Platform strengths
-        strengths = profile.get("strengths", [])[:2]
+        strengths = profile.get("strengths_ordered", ())[:2]
         if strengths:
             parts.append(f"Strengths: {', '.join(s.replace('_', ' ') for s in strengths)}")
         
@@ -493,42 +625,37 @@ class PlatformSelectorService:
         Returns:
             Dict with platform -> performance metrics
         """
-        cutoff_date = datetime.utcnow().date() - timedelta(days=lookback_days)
+        cutoff_date = self._today - timedelta(days=lookback_days)
+
+        # Campaign counts and metric totals for every platform in one query;
+        # the date filter sits in the join so campaigns without recent metrics still count
+        rows = self.db.execute(
+            select(
+                Campaign.platform,
+                func.count(Campaign.id.distinct()).label('campaigns'),
+                func.sum(MarketingMetric.impressions).label('impressions'),
+                func.sum(MarketingMetric.clicks).label('clicks'),
+                func.sum(MarketingMetric.spend).label('spend'),
+                func.sum(MarketingMetric.leads).label('leads'),
+                func.sum(MarketingMetric.closed_won).label('conversions')
+            )
+            .outerjoin(
+                MarketingMetric,
+                and_(
+                    MarketingMetric.campaign_id == Campaign.id,
+                    MarketingMetric.date >= cutoff_date
+                )
+            )
+            .where(Campaign.status.in_([CampaignStatus.ACTIVE, CampaignStatus.COMPLETED]))
+            .group_by(Campaign.platform)
+        ).all()
+        metrics_by_platform = {row.platform.value: row for row in rows}
         
         summary = {}
         
         for platform_key in self.PLATFORM_PROFILES.keys():
-            # Get campaigns for this platform
-            campaigns = self.db.execute(
-                select(Campaign).where(
-                    Campaign.platform == CampaignPlatform(platform_key),
-                    Campaign.status.in_([CampaignStatus.ACTIVE, CampaignStatus.COMPLETED])
-                )
-            ).scalars().all()
-            
-            if not campaigns:
-                summary[platform_key] = {
-                    "display_name": self.PLATFORM_PROFILES[platform_key]["display_name"],
-                    "campaigns": 0,
-                    "has_data": False
-                }
-                continue
-            
-            campaign_ids = [c.id for c in campaigns]
-            
-            # Aggregate metrics
-            metrics = self.db.execute(
-                select(
-                    func.sum(MarketingMetric.impressions).label('impressions'),
-                    func.sum(MarketingMetric.clicks).label('clicks'),
-                    func.sum(MarketingMetric.spend).label('spend'),
-                    func.sum(MarketingMetric.leads).label('leads'),
-                    func.sum(MarketingMetric.closed_won).label('conversions')
-                ).where(
-                    MarketingMetric.campaign_id.in_(campaign_ids),
-                    MarketingMetric.date >= cutoff_date
-                )
-            ).first()
+            metrics = metrics_by_platform.get(platform_key)
+            display_name = self.PLATFORM_PROFILES[platform_key]["display_name"]
             
             if metrics and metrics.impressions:
                 spend = float(metrics.spend or 0)
@@ -536,8 +663,8 @@ class PlatformSelectorService:
                 conversions = metrics.conversions or 0
                 
                 summary[platform_key] = {
-                    "display_name": self.PLATFORM_PROFILES[platform_key]["display_name"],
-                    "campaigns": len(campaigns),
+                    "display_name": display_name,
+                    "campaigns": metrics.campaigns,
                     "has_data": True,
                     "impressions": metrics.impressions,
                     "clicks": metrics.clicks,
@@ -551,8 +678,8 @@ class PlatformSelectorService:
                 }
             else:
                 summary[platform_key] = {
-                    "display_name": self.PLATFORM_PROFILES[platform_key]["display_name"],
-                    "campaigns": len(campaigns),
+                    "display_name": display_name,
+                    "campaigns": metrics.campaigns if metrics else 0,
                     "has_data": False
                 }
         
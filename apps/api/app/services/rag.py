@@ -3,13 +3,42 @@ RAG (Retrieval Augmented Generation) for Knowledge Base
 
 Enables the agent to search FAQs and objection handling from Qdrant.
 """
-from typing import List, Dict, Any
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+import threading
+import time
+import numpy as np
 from ..deps import get_qdrant
 from ..services.embedding_store import QdrantEmbeddingStore
 from ..logging import get_logger
 
 logger = get_logger(__name__)
 
+# Recent search results by (normalized query, top_k): expiry, unit query embedding, items.
+# The knowledge base is small and questions repeat, so exact repeats skip both the
+# embedding call and the vector search, and near-duplicates skip the search.
+_RESULT_CACHE: "OrderedDict[Tuple[str, int], Tuple[float, np.ndarray, List[Dict[str, Any]]]]" = OrderedDict()
+_CACHE_SIZE = 512
+_CACHE_TTL_SECONDS = 3600
+_SEMANTIC_MATCH_THRESHOLD = 0.85
+# Guards every read and write of _RESULT_CACHE across request threads
+_result_cache_lock = threading.Lock()
+
+# Embedding store singleton; the Qdrant and OpenAI clients it wraps are
+# thread-safe, so one instance serves every request
+_embedding_store: Optional[QdrantEmbeddingStore] = None
+_embedding_store_lock = threading.Lock()
+
+
+def _get_embedding_store() -> QdrantEmbeddingStore:
+    """Shared embedding store, created on first use"""
+    global _embedding_store
+    if _embedding_store is None:
+        with _embedding_store_lock:
+            if _embedding_store is None:
+                _embedding_store = QdrantEmbeddingStore(get_qdrant())
+    return _embedding_store
+
 
 def knowledge_search(query: str, top_k: int = 3) -> List[Dict[str, Any]]:
     """
@@ -28,14 +57,34 @@ def knowledge_search(query: str, top_k: int = 3) -> List[Dict[str, Any]]:
         List of matching knowledge items with title and content
     """
     try:
-        qdrant_client = get_qdrant()
-        embedding_store = QdrantEmbeddingStore(qdrant_client)
+        now = time.time()
+        cache_key = (" ".join(query.lower().split()), top_k)
+        with _result_cache_lock:
+            cached = _RESULT_CACHE.get(cache_key)
+            if cached and now < cached[0]:
+                _RESULT_CACHE.move_to_end(cache_key)
+                return [dict(item) for item in cached[2]]
+
+        embedding_store = _get_embedding_store()
+
+        query_embedding = embedding_store.embed(query)
+        unit_embedding = np.asarray(query_embedding, dtype=np.float32)
+        unit_embedding /= np.linalg.norm(unit_embedding) or 1.0
+
+        similar = _find_similar_results(unit_embedding, top_k, now)
+        if similar is not None:
+            # Keep the original expiry so near-duplicates never extend stale results
+            expires, knowledge_items = similar
+            _cache_results(cache_key, expires, unit_embedding, knowledge_items)
+            logger.info("knowledge_search_cache_hit", query=query, results_count=len(knowledge_items))
+            return [dict(item) for item in knowledge_items]
         
         # Search knowledge collection
         results = embedding_store.query(
             collection="knowledge",
             query_text=query,
-            top_k=top_k
+            top_k=top_k,
+            query_embedding=query_embedding
         )
         
         # Format results
@@ -48,11 +97,56 @@ def knowledge_search(query: str, top_k: int = 3) -> List[Dict[str, Any]]:
                 "relevance_score": round(result.score, 3),
             })
         
+        _cache_results(cache_key, now + _CACHE_TTL_SECONDS, unit_embedding, knowledge_items)
+
         logger.info("knowledge_search", query=query, results_count=len(knowledge_items))
         
-        return knowledge_items
+        return [dict(item) for item in knowledge_items]
     
     except Exception as e:
         logger.error("knowledge_search_failed", query=query, error=str(e))
         return []
 
+
+def _cache_results(
+    cache_key: Tuple[str, int],
+    expires: float,
+    unit_embedding: np.ndarray,
+    knowledge_items: List[Dict[str, Any]]
+) -> None:
+    """Store search results, evicting the least recently used beyond _CACHE_SIZE"""
+    with _result_cache_lock:
+        _RESULT_CACHE[cache_key] = (expires, unit_embedding, knowledge_items)
+        _RESULT_CACHE.move_to_end(cache_key)
+        while len(_RESULT_CACHE) > _CACHE_SIZE:
+            _RESULT_CACHE.popitem(last=False)
+
+
+def _find_similar_results(
+    unit_embedding: np.ndarray,
+    top_k: int,
+    now: float
+) -> Optional[Tuple[float, List[Dict[str, Any]]]]:
+    """
+    Find cached results for a semantically equivalent earlier query.
+
+    Compares the query against every live cached query with the same top_k
+    in one matrix-vector product, over a snapshot taken under the cache lock.
+
+    Returns:
+        (expiry, results) of the closest cached query if similar enough, else None
+    """
+    with _result_cache_lock:
+        candidates = [
+            entry for (_, cached_top_k), entry in _RESULT_CACHE.items()
+            if cached_top_k == top_k and now < entry[0]
+        ]
+    if not candidates:
+        return None
+
+    similarities = np.stack([entry[1] for entry in candidates]) @ unit_embedding
+    best = int(np.argmax(similarities))
+    if similarities[best] < _SEMANTIC_MATCH_THRESHOLD:
+        return None
+
+    return candidates[best][0], candidates[best][2]
@@ -1,7 +1,26 @@
 """Lead scoring logic - transparent and tunable"""
+import re
 from typing import Dict, List, Tuple
 from datetime import datetime, timedelta
 
+import numpy as np
+import pandas as pd
+
+# Timeline urgency tiers, checked in priority order against the lowercased move-in text
+_INTENT_RE = re.compile(
+    r"^(?:(?P<immediate>(?=.*(?:immediate|asap)))"
+    r"|(?P<month>(?=.*(?:month|60 days)))"
+    r"|(?P<quarter>(?=.*(?:quarter|90 days))))",
+    re.DOTALL,
+)
+_INTENT_SCORES = {"immediate": 12, "month": 10, "quarter": 6}
+
+# Profile fields that make a request specific
+_SPECIFICITY_FIELDS = ("property_type", "beds", "areas", "preferences")
+
+# Column patterns for the urgency tiers in batch scoring, most urgent first
+_INTENT_TIERS = (("immediate|asap", 12), ("month|60 days", 10), ("quarter|90 days", 6))
+
 
 class LeadScorer:
     """Rule-based lead scoring v1"""
@@ -23,11 +42,12 @@ class LeadScorer:
         Returns (score, reasons)
         """
         reasons = []
-        total_score = 0
+        fit_score, budget_score, intent_score, readiness_score = self._score_all(
+            profile, top_matches, contact
+        )
+        total_score = fit_score + budget_score + intent_score + readiness_score
 
         # 1. Fit score (40%)
-        fit_score = self._score_fit(profile, top_matches)
-        total_score += fit_score
         if fit_score >= 30:
             reasons.append(f"Strong property match ({fit_score}/40)")
         elif fit_score >= 20:
@@ -36,8 +56,6 @@ class LeadScorer:
             reasons.append(f"Weak property match ({fit_score}/40)")
 
         # 2. Budget score (25%)
-        budget_score = self._score_budget(profile, top_matches)
-        total_score += budget_score
         if budget_score >= 20:
             reasons.append(f"Budget well-aligned ({budget_score}/25)")
         elif budget_score >= 10:
@@ -46,8 +64,6 @@ class LeadScorer:
             reasons.append(f"Budget mismatch ({budget_score}/25)")
 
         # 3. Intent score (20%)
-        intent_score = self._score_intent(profile)
-        total_score += intent_score
         if intent_score >= 15:
             reasons.append(f"High urgency/specificity ({intent_score}/20)")
         elif intent_score >= 10:
@@ -56,8 +72,6 @@ class LeadScorer:
             reasons.append(f"Low urgency ({intent_score}/20)")
 
         # 4. Readiness score (15%)
-        readiness_score = self._score_readiness(profile, contact)
-        total_score += readiness_score
         if readiness_score >= 10:
             reasons.append(f"Ready to proceed ({readiness_score}/15)")
         else:
@@ -65,99 +79,176 @@ class LeadScorer:
 
         return int(total_score), reasons
 
-    def _score_fit(self, profile: Dict, top_matches: List[Dict]) -> int:
-        """Score property fit (0-40)"""
-        score = 0
-
-        # Location match (0-20)
-        if profile.get("city") and profile.get("areas"):
-            score += 15  # Has specific location preferences
-            if len(top_matches) > 0:
-                score += 5  # Found matching units
-        elif profile.get("city"):
-            score += 10
-
-        # Type/beds/size match (0-20)
-        if profile.get("property_type"):
-            score += 5
-        if profile.get("beds"):
-            score += 5
-        if profile.get("min_size_m2"):
-            score += 5
-        if len(top_matches) >= 3:
-            score += 5  # Multiple good matches
+    def score_leads_batch(self, leads: pd.DataFrame, matches: pd.DataFrame) -> pd.DataFrame:
+        """
+        Score many leads at once with column operations, matching score_lead.
 
-        return min(score, 40)
+        Args:
+            leads: One row per lead with profile columns plus contact
+                "email"/"phone"; missing columns count as empty
+            matches: Top matches in rank order, with a "lead" column holding
+                the lead's index label and a "price" column
 
-    def _score_budget(self, profile: Dict, top_matches: List[Dict]) -> int:
-        """Score budget alignment (0-25)"""
+        Returns:
+            DataFrame indexed like leads with fit/budget/intent/readiness
+            component scores and total_score
+        """
+        def present(name: str) -> np.ndarray:
+            """Truthiness of a column: non-empty text/lists, non-zero numbers"""
+            if name not in leads:
+                return np.zeros(len(leads), dtype=bool)
+            column = leads[name]
+            if pd.api.types.infer_dtype(column, skipna=True) == "string":
+                return (column.notna() & column.str.len().astype(float).fillna(1).gt(0)).to_numpy()
+            return (column.notna() & column.astype(bool)).to_numpy()
+
+        def numeric(name: str) -> pd.Series:
+            if name not in leads:
+                return pd.Series(0.0, index=leads.index)
+            return pd.to_numeric(leads[name]).fillna(0)
+
+        # Matches as positional lead codes so counts are single bincount passes
+        positions = leads.index.get_indexer(matches["lead"])
+        known = positions >= 0
+        match_count = np.bincount(positions[known], minlength=len(leads))
+
+        # Top five matches per lead, compared against the lead's budget
+        top = known & (matches.groupby("lead", sort=False).cumcount() < 5).to_numpy()
+        top_positions = positions[top]
+        prices = pd.to_numeric(matches.get("price", pd.Series(0, index=matches.index))).fillna(0).to_numpy()[top]
+        in_range = (
+            (prices >= numeric("budget_min").to_numpy()[top_positions])
+            & (prices <= numeric("budget_max").to_numpy()[top_positions])
+        )
+        in_budget = np.bincount(top_positions, weights=in_range, minlength=len(leads))
+
+        # 1. Fit score (0-40)
+        city, areas = present("city"), present("areas")
+        fit = np.where(city & areas, 15 + 5 * (match_count > 0), np.where(city, 10, 0))
+        fit += 5 * (present("property_type").astype(int) + present("beds") + present("min_size_m2"))
+        fit += 5 * (match_count >= 3)
+        fit = np.minimum(fit, 40)
+
+        # 2. Budget score (0-25)
+        budget = np.where(in_budget >= 3, 25, np.where(in_budget >= 1, 20, 10))
+        budget = np.where(present("budget_max"), budget, 5)
+
+        # 3. Intent score (0-20), the most urgent tier mentioned wins
+        move_in = leads.get("move_in_date", pd.Series("", index=leads.index)).fillna("").astype(str).str.lower()
+        intent = np.select(
+            [move_in.str.contains(pattern, regex=True).to_numpy() for pattern, _ in _INTENT_TIERS]
+            + [move_in.ne("").to_numpy()],
+            [tier_score for _, tier_score in _INTENT_TIERS] + [3],
+            default=0
+        )
+        intent += 2 * sum(present(field).astype(int) for field in _SPECIFICITY_FIELDS)
+        intent = np.minimum(intent, 20)
+
+        # 4. Readiness score (0-15)
+        readiness = 4 * (present("email").astype(int) + present("phone"))
+        readiness += np.where(present("preapproved"), 7, np.where(present("financing_notes"), 3, 0))
+        readiness = np.minimum(readiness, 15)
+
+        return pd.DataFrame(
+            {
+                "fit_score": fit,
+                "budget_score": budget,
+                "intent_score": intent,
+                "readiness_score": readiness,
+                "total_score": fit + budget + intent + readiness,
+            },
+            index=leads.index
+        )
+
+    def _score_all(
+        self,
+        profile: Dict,
+        top_matches: List[Dict],
+        contact: Dict,
+    ) -> Tuple[int, int, int, int]:
+        """
+        Score fit, budget, intent and readiness in one pass over the profile.
+
+        Each field is read from the dicts once; the _score_* helpers delegate here.
+
+        Returns:
+            (fit, budget, intent, readiness) component scores
+        """
+        city = profile.get("city")
+        areas = profile.get("areas")
+        property_type = profile.get("property_type")
+        beds = profile.get("beds")
         budget_min = profile.get("budget_min", 0)
         budget_max = profile.get("budget_max", 0)
+        move_in = profile.get("move_in_date", "")
+        match_count = len(top_matches)
+
+        # Fit (0-40): location (0-20), then type/beds/size and match depth (0-20)
+        fit = 0
+        if city and areas:
+            fit += 15  # Has specific location preferences
+            if match_count > 0:
+                fit += 5  # Found matching units
+        elif city:
+            fit += 10
+        if property_type:
+            fit += 5
+        if beds:
+            fit += 5
+        if profile.get("min_size_m2"):
+            fit += 5
+        if match_count >= 3:
+            fit += 5  # Multiple good matches
+        fit = min(fit, 40)
 
+        # Budget (0-25): how many of the top five matches fall within budget
         if not budget_max:
-            return 5  # No budget specified
+            budget = 5  # No budget specified
+        else:
+            in_budget = sum(budget_min <= match.get("price", 0) <= budget_max for match in top_matches[:5])
+            if in_budget >= 3:
+                budget = 25  # Most matches in budget
+            elif in_budget >= 1:
+                budget = 20  # Some matches in budget
+            else:
+                budget = 10  # No matches in budget (red flag)
+
+        # Intent (0-20): timeline urgency (0-12) plus specificity (0-8)
+        urgency = _INTENT_RE.match(move_in.lower())
+        if urgency:
+            intent = _INTENT_SCORES[urgency.lastgroup]
+        elif move_in:
+            intent = 3
+        else:
+            intent = 0
+        intent += 2 * (bool(property_type) + bool(beds) + bool(areas) + bool(profile.get("preferences")))
+        intent = min(intent, 20)
 
-        score = 10  # Has budget
+        # Readiness (0-15): contact validity (0-8) plus pre-approval (0-7)
+        readiness = 4 * (bool(contact.get("email")) + bool(contact.get("phone")))
+        if profile.get("preapproved"):
+            readiness += 7
+        elif profile.get("financing_notes"):
+            readiness += 3
+        readiness = min(readiness, 15)
 
-        # Check if matches fall within budget
-        in_budget = 0
-        for match in top_matches[:5]:
-            price = match.get("price", 0)
-            if budget_min <= price <= budget_max:
-                in_budget += 1
+        return fit, budget, intent, readiness
 
-        if in_budget >= 3:
-            score += 15  # Most matches in budget
-        elif in_budget >= 1:
-            score += 10  # Some matches in budget
-        else:
-            score += 0  # No matches in budget (red flag)
+    def _score_fit(self, profile: Dict, top_matches: List[Dict]) -> int:
+        """Score property fit (0-40)"""
+        return self._score_all(profile, top_matches, {})[0]
 
-        return min(score, 25)
+    def _score_budget(self, profile: Dict, top_matches: List[Dict]) -> int:
+        """Score budget alignment (0-25)"""
+        return self._score_all(profile, top_matches, {})[1]
 
     def _score_intent(self, profile: Dict) -> int:
         """Score intent/urgency (0-20)"""
-        score = 0
-
-        # Timeline urgency (0-12)
-        move_in = profile.get("move_in_date", "")
-        if "immediate" in move_in.lower() or "asap" in move_in.lower():
-            score += 12
-        elif "month" in move_in.lower() or "60 days" in move_in.lower():
-            score += 10
-        elif "quarter" in move_in.lower() or "90 days" in move_in.lower():
-            score += 6
-        elif move_in:
-            score += 3
-
-        # Specificity (0-8)
-        specificity = sum([
-            bool(profile.get("property_type")),
-            bool(profile.get("beds")),
-            bool(profile.get("areas")),
-            bool(profile.get("preferences")),
-        ])
-        score += specificity * 2
-
-        return min(score, 20)
+        return self._score_all(profile, [], {})[2]
 
     def _score_readiness(self, profile: Dict, contact: Dict) -> int:
         """Score readiness (0-15)"""
-        score = 0
-
-        # Contact validity (0-8)
-        if contact.get("email"):
-            score += 4
-        if contact.get("phone"):
-            score += 4
-
-        # Pre-approval (0-7)
-        if profile.get("preapproved"):
-            score += 7
-        elif profile.get("financing_notes"):
-            score += 3
-
-        return min(score, 15)
+        return self._score_all(profile, [], contact)[3]
 
 
 # Singleton instance
@@ -6,13 +6,27 @@ Enables:
 2. Session recovery by email/phone
 3. Anonymous session tracking
 """
-import json
 from typing import Dict, Any, Optional
+
+import orjson
 from redis import Redis
 from ..logging import get_logger
 
 logger = get_logger(__name__)
 
+# Follow a contact index key to its session payload in a single round trip
+_RESOLVE_INDEXED_SESSION = """
+local session_id = redis.call('GET', KEYS[1])
+if not session_id then
+    return nil
+end
+local data = redis.call('GET', 'session:' .. session_id)
+if not data then
+    return nil
+end
+return {session_id, data}
+"""
+
 
 class SessionStore:
     """
@@ -27,6 +41,8 @@ class SessionStore:
     def __init__(self, redis_client: Redis):
         self.redis = redis_client
         self.ttl = 86400 * 7  # 7 days
+        # Runs via EVALSHA, loading the script on first use
+        self._resolve_indexed_session = self.redis.register_script(_RESOLVE_INDEXED_SESSION)
     
     def save_session(
         self,
@@ -37,28 +53,35 @@ class SessionStore:
     ) -> None:
         """Save session context to Redis"""
         try:
+            # Queue the session and its contact indexes, then send them in one round trip
+            pipe = self.redis.pipeline(transaction=False)
+
             # Store by session ID
             key = f"session:{session_id}"
-            self.redis.setex(
+            pipe.setex(
                 key,
                 self.ttl,
-                json.dumps(context)
+                orjson.dumps(context, option=orjson.OPT_NON_STR_KEYS)
             )
             
             # Also index by email if provided
             if email:
                 email_key = f"session:email:{email.lower()}"
-                self.redis.setex(email_key, self.ttl, session_id)
-                logger.info("session_indexed_by_email", session_id=session_id, email=email)
+                pipe.setex(email_key, self.ttl, session_id)
             
             # Also index by phone if provided
             if phone:
                 # Normalize phone (remove spaces, dashes)
                 normalized_phone = phone.replace(" ", "").replace("-", "").replace("(", "").replace(")", "")
                 phone_key = f"session:phone:{normalized_phone}"
-                self.redis.setex(phone_key, self.ttl, session_id)
-                logger.info("session_indexed_by_phone", session_id=session_id, phone=phone)
+                pipe.setex(phone_key, self.ttl, session_id)
+
+            pipe.execute()
             
+            if email:
+                logger.info("session_indexed_by_email", session_id=session_id, email=email)
+            if phone:
+                logger.info("session_indexed_by_phone", session_id=session_id, phone=phone)
             logger.info("session_saved", session_id=session_id)
             
         except Exception as e:
@@ -71,7 +94,7 @@ class SessionStore:
             data = self.redis.get(key)
             
             if data:
-                context = json.loads(data)
+                context = orjson.loads(data)
                 logger.info("session_retrieved", session_id=session_id)
                 return context
             
@@ -85,12 +108,7 @@ class SessionStore:
         """Retrieve session by email"""
         try:
             email_key = f"session:email:{email.lower()}"
-            session_id = self.redis.get(email_key)
-            
-            if session_id:
-                return self.get_session(session_id)
-            
-            return None
+            return self._get_indexed_session(email_key)
         
         except Exception as e:
             logger.error("session_get_by_email_failed", email=email, error=str(e))
@@ -101,17 +119,24 @@ class SessionStore:
         try:
             normalized_phone = phone.replace(" ", "").replace("-", "").replace("(", "").replace(")", "")
             phone_key = f"session:phone:{normalized_phone}"
-            session_id = self.redis.get(phone_key)
-            
-            if session_id:
-                return self.get_session(session_id)
-            
-            return None
+            return self._get_indexed_session(phone_key)
         
         except Exception as e:
             logger.error("session_get_by_phone_failed", phone=phone, error=str(e))
             return None
     
+    def _get_indexed_session(self, index_key: str) -> Optional[Dict[str, Any]]:
+        """Resolve an email/phone index key to its session context server-side"""
+        resolved = self._resolve_indexed_session(keys=[index_key])
+
+        if resolved:
+            session_id, data = resolved
+            context = orjson.loads(data)
+            logger.info("session_retrieved", session_id=session_id, index_key=index_key)
+            return context
+
+        return None
+
     def extract_contact_from_context(self, context: Dict[str, Any]) -> Dict[str, Optional[str]]:
         """
         Extract email/phone from conversation if mentioned
@@ -3,6 +3,7 @@ Persona Discovery Worker
 
 Runs daily to discover new marketing personas from recent lead data.
 """
+import asyncio
 from sqlalchemy.orm import Session
 from ...deps import get_db
 from ...services.marketing.persona_discovery import PersonaDiscoveryService
@@ -24,11 +25,11 @@ def discover_personas_job():
     
     try:
         service = PersonaDiscoveryService(db)
-        personas = service.discover_personas(
+        personas = asyncio.run(service.discover_personas(
             min_cluster_size=25,
             min_samples=5,
             method="hdbscan"
-        )
+        ))
         
         logger.info("persona_discovery_job_completed", 
                    personas_discovered=len(personas))
@@ -39,7 +39,8 @@ def run_learning_job(
         learning_service = LearningService(db)
         learning_result = learning_service.run_learning_cycle(
             lookback_days=lookback_days,
-            auto_apply=auto_apply
+            auto_apply=auto_apply,
+            n_workers=LearningService.MAX_LEARNING_WORKERS
         )
         
         # Check experiment stopping rules
@@ -62,9 +63,8 @@ def run_learning_job(
         
         # Match unassigned leads to personas
         lead_matcher = LeadPersonaMatcherService(db)
-        lead_matches = lead_matcher.batch_match_leads(auto_assign=auto_apply)
         leads_matched = sum(
-            1 for matches in lead_matches.values()
+            1 for _, matches in lead_matcher.iter_batch_matches(auto_assign=auto_apply, top_k=1)
             if matches and matches[0].is_strong_match
         )
         
@@ -8,6 +8,8 @@ Tests the complete marketing workflow:
 4. Track attribution
 5. Optimize budgets
 """
+import asyncio
+
 import pytest
 from sqlalchemy.orm import Session
 from app.services.marketing.persona_discovery import PersonaDiscoveryService
@@ -86,10 +88,10 @@ def test_e2e_marketing_workflow(db: Session, complete_lead_dataset):
     # STEP 1: Discover Personas
     print("\n=== STEP 1: Discover Personas ===")
     persona_service = PersonaDiscoveryService(db)
-    personas = persona_service.discover_personas(
+    personas = asyncio.run(persona_service.discover_personas(
         min_cluster_size=20,
         method="kmeans"
-    )
+    ))
     
     assert len(personas) >= 2, "Should discover at least 2 personas"
     print(f"✓ Discovered {len(personas)} personas")
@@ -0,0 +1,150 @@
+"""Tests for lead persona matcher scoring"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services.marketing.lead_persona_matcher import (
+    LeadPersonaMatcherService,
+    PersonaIndex,
+    ProfileView,
+)
+
+
+@pytest.fixture
+def matcher():
+    """Matcher without a session - scoring helpers are pure"""
+    return LeadPersonaMatcherService(db=None)
+
+
+@pytest.fixture
+def profiles():
+    """Lead profiles covering missing and partial data"""
+    rows = [
+        SimpleNamespace(
+            budget_min=150000, budget_max=300000, property_type="Apartment",
+            city="Dubai", areas=["Dubai Marina", "JBR"],
+            move_in_date="immediately", preapproved=True,
+        ),
+        SimpleNamespace(
+            budget_min=50000, budget_max=None, property_type="house",
+            city=None, areas=["Downtown"],
+            move_in_date="flexible", preapproved=False,
+        ),
+        SimpleNamespace(
+            budget_min=None, budget_max=None, property_type=None,
+            city=None, areas=None,
+            move_in_date=None, preapproved=None,
+        ),
+        SimpleNamespace(
+            budget_min=2000000, budget_max=0, property_type="penthouse",
+            city="Abu Dhabi", areas=[],
+            move_in_date="in 6 months", preapproved=True,
+        ),
+    ]
+    return [ProfileView.from_profile(row) for row in rows]
+
+
+@pytest.fixture
+def personas():
+    """Personas with complete, partial and empty rules"""
+    rows = [
+        SimpleNamespace(
+            id=1, name="Marina Professionals",
+            rules={
+                "budget_range": [100000, 300000],
+                "property_types": ["apartment", "flat"],
+                "locations": ["Dubai Marina", "Downtown"],
+                "urgency": "high",
+            },
+            characteristics={"urgency": "high", "price_sensitivity": "low"},
+        ),
+        SimpleNamespace(
+            id=2, name="Family Villas",
+            rules={
+                "budget_range": [1000000, 3000000],
+                "property_types": ["villa"],
+                "locations": ["Arabian Ranches"],
+            },
+            characteristics={"urgency": "low", "price_sensitivity": "high"},
+        ),
+        SimpleNamespace(id=3, name="Unknown", rules=None, characteristics=None),
+    ]
+    return [PersonaIndex.from_persona(row) for row in rows]
+
+
+def test_score_matrix_matches_single_lead_scoring(matcher, profiles, personas):
+    """Vectorized batch scores must equal per-pair _calculate_match"""
+    scores, factors, confidence = matcher._score_matrix(profiles, personas)
+
+    assert scores.shape == (len(profiles), len(personas))
+    for i, profile in enumerate(profiles):
+        for j, persona in enumerate(personas):
+            expected = matcher._calculate_match(None, profile, persona)
+            match = matcher._build_match(persona, scores[i, j], factors[i, j], confidence[i, j])
+
+            assert match.match_score == pytest.approx(expected.match_score)
+            assert match.confidence == pytest.approx(expected.confidence)
+            assert match.match_factors == pytest.approx(expected.match_factors)
+            assert match.is_strong_match == expected.is_strong_match
+
+
+def test_strong_match_for_aligned_profile(matcher, profiles, personas):
+    """A lead that fits every persona rule is a strong match"""
+    scores, _, _ = matcher._score_matrix(profiles[:1], personas[:1])
+
+    assert scores[0, 0] >= matcher.STRONG_MATCH_THRESHOLD
+
+
+@pytest.mark.parametrize("move_in_date, expected", [
+    ("ASAP please", "high"),
+    ("flexible, but could move now", "high"),
+    ("no rush, maybe next month", "low"),
+    ("within 3 months", "medium"),
+    ("sometime", "medium"),
+])
+def test_lead_urgency_keyword_priority(move_in_date, expected):
+    """Earlier keyword groups win regardless of position in the text"""
+    assert LeadPersonaMatcherService._lead_urgency(move_in_date) == expected
+
+
+def test_early_exit_only_drops_pairs_below_min_score(matcher, profiles, personas):
+    """Pruned pairs would have scored below min_score; kept pairs are unchanged"""
+    for profile in profiles:
+        for persona in personas:
+            full = matcher._calculate_match(None, profile, persona)
+            pruned = matcher._calculate_match(None, profile, persona, min_score=60.0)
+
+            if pruned is None:
+                assert full.match_score < 60.0
+            else:
+                assert pruned.match_score == full.match_score
+
+
+def test_rank_rows_top_k_matches_full_stable_sort():
+    """Partition-based top-k keeps the same personas, in the same order, as a full sort"""
+    scores = np.array([
+        [55.0, 72.0, 72.0, 72.0, 40.0, 90.0],
+        [60.0, 60.0, 60.0, 60.0, 60.0, 60.0],
+    ])
+
+    full = LeadPersonaMatcherService._rank_rows(scores, 50.0, None)
+    for k in (1, 2, 3, 6):
+        top = LeadPersonaMatcherService._rank_rows(scores, 50.0, k)
+        assert [row.tolist() for row in top] == [row[:k].tolist() for row in full]
+
+    assert full[0].tolist() == [5, 1, 2, 3, 0]
+
+
+def test_unknown_persona_urgency_scores_as_opposite(matcher, profiles):
+    """Scalar and vectorized paths agree on an urgency outside the known levels"""
+    persona = PersonaIndex.from_persona(SimpleNamespace(
+        id=9, name="Odd", rules={}, characteristics={"urgency": "someday"},
+    ))
+
+    _, factors, _ = matcher._score_matrix(profiles, [persona])
+
+    for i, profile in enumerate(profiles):
+        expected = matcher._calculate_urgency_match(profile.move_in_date, "someday")
+        assert factors[i, 0, 3] == pytest.approx(expected)
+    assert matcher._calculate_urgency_match("immediately", "someday") == 0.4
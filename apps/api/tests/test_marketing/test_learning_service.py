@@ -0,0 +1,49 @@
+"""Tests for learning service scoring"""
+import numpy as np
+import pytest
+
+from app.services.marketing.learning_service import LearningService, _hook_matcher
+
+
+def test_creative_scores_vectorized():
+    """Each creative is scored independently, with zero-safe ratios"""
+    ctr, cvr, cpl, scores = LearningService._calculate_creative_scores(
+        impressions=np.array([10000, 200000, 5000, 0]),
+        clicks=np.array([300, 1000, 50, 0]),
+        spend=np.array([500.0, 4000.0, 100.0, 0.0]),
+        leads=np.array([10, 8, 0, 0]),
+        conversions=np.array([1, 0, 0, 0]),
+    )
+
+    assert ctr.tolist() == pytest.approx([0.03, 0.005, 0.01, 0.0])
+    assert cvr.tolist() == pytest.approx([0.1, 0.0, 0.0, 0.0])
+    assert cpl.tolist() == pytest.approx([50.0, 500.0, 0.0, 0.0])
+    assert scores.tolist() == pytest.approx([
+        0.25 + 0.45 + 0.30 * 0.9 + 0.1,
+        0.25 / 6 + 0.1,
+        0.25 / 3 + 0.30 + 0.05,
+        0.30,
+    ])
+
+
+@pytest.mark.parametrize("text", [
+    "luxury waterfront living in the marina",
+    "waterfront views, family friendly",
+    "living",
+    "",
+])
+def test_hook_matcher_equals_substring_search(text):
+    """Overlapping and nested hooks are all found in a single pass"""
+    terms = ("luxury waterfront living", "waterfront", "living", "family friendly", "front")
+
+    assert _hook_matcher(terms)(text) == {term for term in terms if term in text}
+
+
+def test_group_argmax_first_best_per_group():
+    """Best index per group, earliest index winning ties"""
+    groups, best = LearningService._group_argmax(
+        np.array([7, 3, 7, 3, 7, 5]),
+        np.array([0.4, 0.9, 0.8, 0.9, 0.8, 0.1]),
+    )
+
+    assert dict(zip(groups, best)) == {3: 1, 5: 5, 7: 2}
@@ -1,8 +1,11 @@
 """Tests for persona discovery service"""
+import asyncio
+import numpy as np
 import pytest
 from sqlalchemy.orm import Session
 from app.services.marketing.persona_discovery import PersonaDiscoveryService
-from app.models import Lead, LeadProfile, Qualification, Contact, LeadSource, LeadStatus
+from app.models import Lead, LeadProfile, Qualification, Contact
+from app.models.lead import LeadSource, LeadStatus
 
 
 @pytest.fixture
@@ -104,11 +107,11 @@ def test_persona_discovery_finds_clusters(db: Session, sample_leads):
     """Test that persona discovery identifies distinct clusters"""
     service = PersonaDiscoveryService(db)
     
-    personas = service.discover_personas(
+    personas = asyncio.run(service.discover_personas(
         min_cluster_size=20,
         min_samples=5,
         method="kmeans"  # Use kmeans for deterministic results
-    )
+    ))
     
     # Should find at least 2 personas
     assert len(personas) >= 2
@@ -126,7 +129,7 @@ def test_persona_discovery_finds_clusters(db: Session, sample_leads):
 def test_persona_has_budget_range(db: Session, sample_leads):
     """Test that personas have budget range rules"""
     service = PersonaDiscoveryService(db)
-    personas = service.discover_personas(min_cluster_size=20, method="kmeans")
+    personas = asyncio.run(service.discover_personas(min_cluster_size=20, method="kmeans"))
     
     for persona in personas:
         assert "budget_range" in persona.rules
@@ -137,7 +140,7 @@ def test_persona_has_budget_range(db: Session, sample_leads):
 def test_persona_has_characteristics(db: Session, sample_leads):
     """Test that personas have behavioral characteristics"""
     service = PersonaDiscoveryService(db)
-    personas = service.discover_personas(min_cluster_size=20, method="kmeans")
+    personas = asyncio.run(service.discover_personas(min_cluster_size=20, method="kmeans"))
     
     for persona in personas:
         assert "urgency" in persona.characteristics
@@ -150,7 +153,7 @@ def test_persona_has_characteristics(db: Session, sample_leads):
 def test_persona_has_messaging(db: Session, sample_leads):
     """Test that personas have messaging hooks"""
     service = PersonaDiscoveryService(db)
-    personas = service.discover_personas(min_cluster_size=20, method="kmeans")
+    personas = asyncio.run(service.discover_personas(min_cluster_size=20, method="kmeans"))
     
     for persona in personas:
         assert "hooks" in persona.messaging
@@ -161,7 +164,7 @@ def test_persona_has_messaging(db: Session, sample_leads):
 def test_persona_confidence_score(db: Session, sample_leads):
     """Test that confidence score reflects sample size"""
     service = PersonaDiscoveryService(db)
-    personas = service.discover_personas(min_cluster_size=20, method="kmeans")
+    personas = asyncio.run(service.discover_personas(min_cluster_size=20, method="kmeans"))
     
     for persona in personas:
         assert persona.confidence_score > 0
@@ -184,7 +187,27 @@ def test_insufficient_data_returns_empty(db: Session):
     db.commit()
     
     service = PersonaDiscoveryService(db)
-    personas = service.discover_personas(min_cluster_size=25)
+    personas = asyncio.run(service.discover_personas(min_cluster_size=25))
     
     assert len(personas) == 0
 
+
+
+def test_cluster_means_skip_noise_and_nans():
+    """Cluster means ignore noise rows and missing values"""
+    means = PersonaDiscoveryService._cluster_means(
+        np.array([[2.0, 1.0], [4.0, np.nan], [9.0, 9.0], [3.0, 0.0]]),
+        np.array([0, 0, -1, 1]),
+    )
+
+    assert means.tolist() == [[3.0, 1.0], [3.0, 0.0]]
+
+
+def test_stats_fingerprint_rounds_near_identical_clusters():
+    """Clusters whose stats only differ by rounding share a cached profile"""
+    stats = {"size": 40, "avg_budget": 251000.0, "avg_beds": 2.004, "common_areas": ["JVC"]}
+
+    fingerprint = PersonaDiscoveryService._stats_fingerprint
+
+    assert fingerprint(stats) == fingerprint({**stats, "avg_budget": 249000.0, "avg_beds": 2.001})
+    assert fingerprint(stats) != fingerprint({**stats, "size": 41})
@@ -1,4 +1,7 @@
 """Test lead scoring logic"""
+import warnings
+
+import pandas as pd
 import pytest
 from app.services.scoring import LeadScorer
 
@@ -53,3 +56,84 @@ def test_score_low_quality_lead():
 
     assert score < 60, f"Low-quality lead should score < 60, got {score}"
     assert len(reasons) > 0, "Should provide reasons"
+
+
+@pytest.mark.parametrize("move_in, expected", [
+    ("Within a month, ASAP if possible", 12),
+    ("next quarter or 60 days", 10),
+    ("90 DAYS", 6),
+    ("flexible", 3),
+    ("", 0),
+])
+def test_intent_urgency_tiers_by_priority(move_in, expected):
+    """The most urgent timeline mentioned wins, regardless of position or case"""
+    scorer = LeadScorer()
+
+    assert scorer._score_intent({"move_in_date": move_in}) == expected
+
+
+def test_batch_scores_match_single_lead_scores():
+    """Batch scoring agrees with score_lead lead by lead"""
+    scorer = LeadScorer()
+
+    leads = [
+        (
+            {"city": "Dubai", "areas": ["JBR"], "property_type": "villa", "beds": 3,
+             "budget_min": 100000, "budget_max": 200000, "move_in_date": "next quarter", "preapproved": True},
+            [{"price": 150000}, {"price": 250000}, {"price": 120000}, {"price": 180000}],
+            {"email": "a@example.com"},
+        ),
+        (
+            {"city": "Dubai", "budget_max": 90000, "move_in_date": "ASAP", "financing_notes": "mortgage"},
+            [{"price": 150000}],
+            {"phone": "+971500000000"},
+        ),
+        ({"budget_min": 50000, "budget_max": 60000}, [], {}),
+    ]
+
+    expected = [scorer.score_lead(profile, matches, contact)[0] for profile, matches, contact in leads]
+    batch = scorer.score_leads_batch(
+        pd.DataFrame([{**profile, **contact} for profile, _, contact in leads]),
+        pd.DataFrame(
+            [{"lead": i, **match} for i, (_, matches, _) in enumerate(leads) for match in matches]
+        ),
+    )
+
+    assert batch["total_score"].tolist() == expected
+
+
+def test_batch_scores_match_single_lead_scores_with_mixed_columns():
+    """Falsy values in mixed-type columns count as missing, as in score_lead"""
+    scorer = LeadScorer()
+
+    leads = [
+        ({"city": "Dubai", "areas": [], "property_type": 0.0, "beds": "", "preapproved": False}, [], {"email": ""}),
+        ({"city": False, "areas": ["JBR"], "property_type": "villa", "beds": False, "preapproved": "yes"}, [], {"email": False}),
+        ({"city": "", "areas": "Marina", "property_type": None, "beds": "2", "preapproved": True}, [], {"email": "a@example.com"}),
+    ]
+
+    expected = [scorer.score_lead(profile, matches, contact)[0] for profile, matches, contact in leads]
+    batch = scorer.score_leads_batch(
+        pd.DataFrame([{**profile, **contact} for profile, _, contact in leads], dtype=object),
+        pd.DataFrame({"lead": [], "price": []}),
+    )
+
+    assert batch["total_score"].tolist() == expected
+
+
+def test_batch_scores_sparse_object_columns_without_warnings():
+    """All-None and None-padded object columns score as missing, without pandas warnings"""
+    leads = pd.DataFrame({
+        "city": pd.Series([None, None], dtype=object),
+        "beds": pd.Series([2, None], dtype=object),
+        "budget_max": pd.Series([None, 0], dtype=object),
+        "preapproved": pd.Series([True, None], dtype=object),
+    })
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        batch = LeadScorer().score_leads_batch(leads, pd.DataFrame({"lead": [], "price": []}))
+
+    assert batch["fit_score"].tolist() == [5, 0]
+    assert batch["budget_score"].tolist() == [5, 5]
+    assert batch["readiness_score"].tolist() == [7, 0]